@@ -5,24 +5,33 @@ import sqlite3
 import os
 from pathlib import Path
 
+# Schema is read once at import, so repeated calls (e.g. test fixtures) only
+# touch disk for the database file itself
+_SCHEMA = (Path(__file__).parent / "schema.sql").read_text()
+
+# WAL + synchronous=NORMAL avoids an fsync per statement; mmap speeds up reads
+_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-65536;
+    PRAGMA mmap_size=268435456;
+"""
+
 def init_database(db_path: str = "db/arbitrage.sqlite"):
     """Create database and apply schema."""
     # Ensure directory exists
     os.makedirs(os.path.dirname(db_path), exist_ok=True)
     
-    # Read schema
-    schema_path = Path(__file__).parent / "schema.sql"
-    with open(schema_path, 'r') as f:
-        schema = f.read()
-    
     # Create database and apply schema
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
-    # Execute schema
-    cursor.executescript(schema)
+    cursor.executescript(_PRAGMAS)
+    
+    # Execute schema in a single transaction
+    cursor.executescript(f"BEGIN;\n{_SCHEMA}\nCOMMIT;")
     
-    conn.commit()
     conn.close()
     
     print(f"Database initialized at {db_path}")
@@ -32,7 +32,11 @@ CREATE TABLE IF NOT EXISTS steam_snapshots (
     UNIQUE(item_id, timestamp)
 );
 
-CREATE INDEX IF NOT EXISTS idx_steam_snapshots_item_id ON steam_snapshots(item_id);
+-- Covering index for per-item history / latest lookups (no table access needed).
+-- Replaces the plain item_id index, which is a prefix of it.
+DROP INDEX IF EXISTS idx_steam_snapshots_item_id;
+CREATE INDEX IF NOT EXISTS idx_steam_item_ts
+    ON steam_snapshots(item_id, timestamp DESC, best_bid, median_price, volume_7d);
 CREATE INDEX IF NOT EXISTS idx_steam_snapshots_timestamp ON steam_snapshots(timestamp);
 
 -- Buff snapshots: price and order book data from Buff
@@ -52,9 +56,22 @@ CREATE TABLE IF NOT EXISTS buff_snapshots (
     UNIQUE(item_id, timestamp)
 );
 
-CREATE INDEX IF NOT EXISTS idx_buff_snapshots_item_id ON buff_snapshots(item_id);
+-- Covering index for per-item history / latest lookups
+DROP INDEX IF EXISTS idx_buff_snapshots_item_id;
+CREATE INDEX IF NOT EXISTS idx_buff_item_ts
+    ON buff_snapshots(item_id, timestamp DESC, best_ask, volume_7d);
 CREATE INDEX IF NOT EXISTS idx_buff_snapshots_timestamp ON buff_snapshots(timestamp);
 
+-- Raw API responses: compressed JSON, kept out of the snapshot tables so
+-- their rows stay small (snapshot raw_response columns are no longer written)
+CREATE TABLE IF NOT EXISTS raw_responses (
+    snapshot_id INTEGER NOT NULL,
+    source TEXT NOT NULL,  -- 'steam' or 'buff'
+    codec TEXT NOT NULL DEFAULT 'zlib',  -- 'zlib' or 'zstd'
+    body BLOB NOT NULL,
+    PRIMARY KEY (snapshot_id, source)
+);
+
 -- Book depth: detailed order book data (optional, for deeper analysis)
 CREATE TABLE IF NOT EXISTS book_depth (
     depth_id INTEGER PRIMARY KEY AUTOINCREMENT,
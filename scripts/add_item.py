@@ -7,19 +7,52 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from src.db.client import DatabaseClient
 
+def read_items_file(path):
+    """Read items from a file, one per line.
+    
+    Each line is a market hash name, optionally followed by a tab and the
+    Buff goods ID. Blank lines and lines starting with '#' are skipped.
+    """
+    rows = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            name, _, goods_id = line.partition('\t')
+            rows.append((name.strip(), int(goods_id) if goods_id.strip() else None))
+    return rows
+
 def main():
-    parser = argparse.ArgumentParser(description='Add an item to the database')
-    parser.add_argument('market_hash_name', help='Steam market hash name')
-    parser.add_argument('--buff_goods_id', type=int, help='Buff goods ID (optional)')
+    parser = argparse.ArgumentParser(description='Add items to the database')
+    parser.add_argument('market_hash_name', nargs='*', help='Steam market hash name(s)')
+    parser.add_argument('--buff_goods_id', type=int, help='Buff goods ID (optional, single item only)')
+    parser.add_argument('--file', help='File with one market hash name per line (optional tab + Buff goods ID)')
     parser.add_argument('--db_path', default='db/arbitrage.sqlite', help='Database path')
     
     args = parser.parse_args()
     
+    rows = [(name, None) for name in args.market_hash_name]
+    if args.file:
+        rows.extend(read_items_file(args.file))
+    
+    if not rows:
+        parser.error('Provide at least one market hash name or --file')
+    if args.buff_goods_id is not None and len(rows) > 1:
+        parser.error('--buff_goods_id can only be used with a single item')
+    
     db_client = DatabaseClient(args.db_path)
-    item_id = db_client.get_or_create_item(args.market_hash_name, args.buff_goods_id)
     
-    print(f"Item added/updated: item_id={item_id}, market_hash_name={args.market_hash_name}")
+    if len(rows) == 1:
+        market_hash_name, buff_goods_id = rows[0]
+        if args.buff_goods_id is not None:
+            buff_goods_id = args.buff_goods_id
+        item_id = db_client.get_or_create_item(market_hash_name, buff_goods_id)
+        print(f"Item added/updated: item_id={item_id}, market_hash_name={market_hash_name}")
+    else:
+        # One transaction for the whole batch
+        count = db_client.bulk_upsert_items(rows)
+        print(f"Items added/updated: {count}")
 
 if __name__ == "__main__":
     main()
-
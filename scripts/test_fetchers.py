@@ -7,9 +7,11 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import argparse
+import asyncio
 import logging
-from src.fetcher.steam import SteamFetcher
-from src.fetcher.buff import BuffFetcher
+import aiohttp
+from src.fetcher.aio import AsyncSteamFetcher, AsyncBuffFetcher
 
 # Configure logging
 logging.basicConfig(
@@ -19,114 +21,197 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Output is collected here and written once at the end
+_output = []
+
+# Set by --quiet: skip per-field details and the workflow explanation
+QUIET = False
+
+
+def emit(text=""):
+    """Queue a line of output."""
+    _output.append(text)
+
+
+def flush_output():
+    """Write all queued output in a single call."""
+    if _output:
+        sys.stdout.write("\n".join(_output) + "\n")
+        sys.stdout.flush()
+        _output.clear()
+
+
 def print_section(title):
     """Print a formatted section header."""
-    print("\n" + "=" * 70)
-    print(f"  {title}")
-    print("=" * 70)
+    emit("\n" + "=" * 70)
+    emit(f"  {title}")
+    emit("=" * 70)
 
 
 def print_result(label, value, indent=2):
     """Print a formatted result line."""
     spaces = " " * indent
-    print(f"{spaces}{label}: {value}")
+    emit(f"{spaces}{label}: {value}")
 
 
-def test_steam_fetcher():
-    """Test Steam marketplace fetcher."""
-    print_section("Testing Steam Marketplace Fetcher")
+def print_detail(label, value):
+    """Print a nested result line, unless running with --quiet."""
+    if not QUIET:
+        print_result(label, value, indent=4)
+
+
+STEAM_TEST_ITEMS = [
+    "AK-47 | Redline (Field-Tested)",
+    "AWP | Asiimov (Field-Tested)",
+]
+
+BUFF_SEARCH_TERMS = [
+    "AK-47 Redline",
+    "AK-47",
+    "Redline",
+]
+
+
+async def fetch_steam(fetcher):
+    """Fetch all Steam test items concurrently."""
+    results = await asyncio.gather(
+        *[fetcher.fetch_price_overview(item_name) for item_name in STEAM_TEST_ITEMS]
+    )
+    return list(zip(STEAM_TEST_ITEMS, results))
+
+
+async def fetch_buff(fetcher):
+    """Run the Buff probes: search fallback chain, then sell + buy orders concurrently."""
+    attempts = []
+    goods_id = None
+    
+    # Search terms are a fallback chain, so these stay sequential
+    for search_term in BUFF_SEARCH_TERMS:
+        search_result = await fetcher.search_goods(search_term)
+        attempts.append((search_term, search_result))
+        
+        if search_result and search_result.get('success'):
+            items = search_result.get('data', {}).get('items', [])
+            if items:
+                goods_id = items[0].get('id')
+                break
+    
+    sell_result = buy_result = None
+    if goods_id is not None:
+        sell_result, buy_result = await fetcher.get_orders_both(goods_id)
+    
+    return {
+        'attempts': attempts,
+        'goods_id': goods_id,
+        'sell_result': sell_result,
+        'buy_result': buy_result
+    }
+
+
+async def run_probes(steam=True, buff=True):
+    """Run Steam and Buff probes concurrently over one shared HTTP session.
     
-    fetcher = SteamFetcher()
-    test_items = [
-        "AK-47 | Redline (Field-Tested)",
-        "AWP | Asiimov (Field-Tested)",
-    ]
+    Returns:
+        Tuple of (steam_fetcher, steam_results, buff_fetcher, buff_results)
+    """
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=10)) as session:
+        steam_fetcher = AsyncSteamFetcher(session=session)
+        buff_fetcher = AsyncBuffFetcher(session=session)
+        
+        async def skip():
+            return None
+        
+        steam_results, buff_results = await asyncio.gather(
+            fetch_steam(steam_fetcher) if steam else skip(),
+            fetch_buff(buff_fetcher) if buff else skip()
+        )
+    
+    return steam_fetcher, steam_results, buff_fetcher, buff_results
+
+
+def report_steam(fetcher, results):
+    """Print Steam marketplace fetcher results."""
+    print_section("Testing Steam Marketplace Fetcher")
     
     print_result("Rate limit", f"{fetcher.rate_limit} requests/minute")
     print_result("Currency ID", fetcher.currency_id)
-    print()
+    emit()
     
-    for item_name in test_items:
-        print(f"\n  Testing: {item_name}")
-        print("  " + "-" * 66)
-        
-        result = fetcher.fetch_price_overview(item_name)
+    for item_name, result in results:
+        emit(f"\n  Testing: {item_name}")
+        emit("  " + "-" * 66)
         
         if result:
             if result.get('success'):
                 print_result("✓ Status", "SUCCESS")
-                print_result("  HTTP Status", result.get('status_code'))
-                print_result("  Latency", f"{result.get('latency_ms')} ms")
+                print_detail("HTTP Status", result.get('status_code'))
+                print_detail("Latency", f"{result.get('latency_ms')} ms")
                 
                 if result.get('lowest_price'):
-                    print_result("  Lowest Price", f"${result.get('lowest_price'):.2f}")
+                    print_detail("Lowest Price", f"${result.get('lowest_price'):.2f}")
                 if result.get('median_price'):
-                    print_result("  Median Price", f"${result.get('median_price'):.2f}")
+                    print_detail("Median Price", f"${result.get('median_price'):.2f}")
                 if result.get('volume'):
-                    print_result("  Volume", result.get('volume'))
+                    print_detail("Volume", result.get('volume'))
                 
                 # Show raw response structure
                 raw = result.get('raw_response', {})
-                print_result("  Raw Response Keys", list(raw.keys()))
+                print_detail("Raw Response Keys", list(raw.keys()))
             else:
                 print_result("✗ Status", "FAILED")
-                print_result("  Error", result.get('error', 'Unknown error'))
+                print_detail("Error", result.get('error', 'Unknown error'))
         else:
             print_result("✗ Status", "FAILED - No response")
     
     return True
 
 
-def test_buff_fetcher():
-    """Test Buff marketplace fetcher."""
+def test_steam_fetcher():
+    """Test Steam marketplace fetcher."""
+    fetcher, results, _, _ = asyncio.run(run_probes(buff=False))
+    ok = report_steam(fetcher, results)
+    flush_output()
+    return ok
+
+
+def report_buff(fetcher, results):
+    """Print Buff marketplace fetcher results."""
     print_section("Testing Buff Marketplace Fetcher")
     
-    fetcher = BuffFetcher()
-    
     print_result("Rate limit", f"{fetcher.rate_limit} requests/minute")
     print_result("Cookie set", "Yes" if fetcher.cookie else "No (some endpoints may require auth)")
-    print()
+    emit()
     
     # Test 1: Search for goods (try multiple search terms)
-    print("\n  1. Testing Search Function")
-    print("  " + "-" * 66)
-    
-    search_terms = [
-        "AK-47 Redline",
-        "AK-47",
-        "Redline",
-    ]
+    emit("\n  1. Testing Search Function")
+    emit("  " + "-" * 66)
     
     search_result = None
     goods_id = None
     
-    for search_term in search_terms:
+    for search_term, search_result in results['attempts']:
         print_result(f"Trying search term", search_term)
-        search_result = fetcher.search_goods(search_term)
         
         if search_result and search_result.get('success'):
             print_result("✓ Status", "SUCCESS")
-            print_result("  HTTP Status", search_result.get('status_code'))
-            print_result("  Latency", f"{search_result.get('latency_ms')} ms")
+            print_detail("HTTP Status", search_result.get('status_code'))
+            print_detail("Latency", f"{search_result.get('latency_ms')} ms")
             
             data = search_result.get('data', {})
             items = data.get('items', [])
-            print_result("  Items found", len(items))
+            print_detail("Items found", len(items))
             
             # Show response structure for debugging
-            print_result("  Response keys", list(data.keys()))
+            print_detail("Response keys", list(data.keys()))
             if 'code' in data:
-                print_result("  Response code", data.get('code'))
+                print_detail("Response code", data.get('code'))
             if 'msg' in data:
-                print_result("  Response message", data.get('msg'))
-            
-            if items:
-                break
+                print_detail("Response message", data.get('msg'))
         else:
-            print_result("  Result", "No items found or failed")
+            print_detail("Result", "No items found or failed")
             if search_result:
-                print_result("  HTTP Status", search_result.get('status_code', 'N/A'))
-            print()
+                print_detail("HTTP Status", search_result.get('status_code', 'N/A'))
+            emit()
     
     if search_result and search_result.get('success'):
         data = search_result.get('data', {})
@@ -136,112 +221,120 @@ def test_buff_fetcher():
             first_item = items[0]
             goods_id = first_item.get('id')
             goods_name = first_item.get('name', 'N/A')
-            print_result("  First item ID", goods_id)
-            print_result("  First item name", goods_name[:50] + "..." if len(goods_name) > 50 else goods_name)
+            print_detail("First item ID", goods_id)
+            print_detail("First item name", goods_name[:50] + "..." if len(goods_name) > 50 else goods_name)
             
             # Test 2: Get sell orders (asks)
-            print("\n  2. Testing Sell Orders (Asks)")
-            print("  " + "-" * 66)
+            emit("\n  2. Testing Sell Orders (Asks)")
+            emit("  " + "-" * 66)
             print_result("Goods ID", goods_id)
             
-            sell_result = fetcher.get_sell_orders(goods_id)
+            sell_result = results['sell_result']
             
             if sell_result and sell_result.get('success'):
                 print_result("✓ Status", "SUCCESS")
-                print_result("  HTTP Status", sell_result.get('status_code'))
-                print_result("  Latency", f"{sell_result.get('latency_ms')} ms")
+                print_detail("HTTP Status", sell_result.get('status_code'))
+                print_detail("Latency", f"{sell_result.get('latency_ms')} ms")
                 
                 best_ask = sell_result.get('best_ask')
                 order_count = sell_result.get('order_count', 0)
                 
                 if best_ask:
-                    print_result("  Best Ask", f"¥{best_ask:.2f}")
+                    print_detail("Best Ask", f"¥{best_ask:.2f}")
                 else:
-                    print_result("  Best Ask", "None")
+                    print_detail("Best Ask", "None")
                 
-                print_result("  Order Count", order_count)
+                print_detail("Order Count", order_count)
                 
                 # Show sample orders
                 orders = sell_result.get('orders', [])
-                if orders:
-                    print("\n  Sample orders (top 3):")
+                if orders and not QUIET:
+                    emit("\n  Sample orders (top 3):")
                     for i, order in enumerate(orders[:3], 1):
                         price = order.get('price', 'N/A')
-                        print(f"    {i}. Price: ¥{price}")
+                        emit(f"    {i}. Price: ¥{price}")
             else:
                 print_result("✗ Status", "FAILED")
                 if sell_result:
-                    print_result("  HTTP Status", sell_result.get('status_code', 'N/A'))
+                    print_detail("HTTP Status", sell_result.get('status_code', 'N/A'))
                 else:
-                    print_result("  Error", "No response")
+                    print_detail("Error", "No response")
             
             # Test 3: Get buy orders (bids)
-            print("\n  3. Testing Buy Orders (Bids)")
-            print("  " + "-" * 66)
+            emit("\n  3. Testing Buy Orders (Bids)")
+            emit("  " + "-" * 66)
             print_result("Goods ID", goods_id)
             
-            buy_result = fetcher.get_buy_orders(goods_id)
+            buy_result = results['buy_result']
             
             if buy_result and buy_result.get('success'):
                 print_result("✓ Status", "SUCCESS")
-                print_result("  HTTP Status", buy_result.get('status_code'))
-                print_result("  Latency", f"{buy_result.get('latency_ms')} ms")
+                print_detail("HTTP Status", buy_result.get('status_code'))
+                print_detail("Latency", f"{buy_result.get('latency_ms')} ms")
                 
                 best_bid = buy_result.get('best_bid')
                 order_count = buy_result.get('order_count', 0)
                 
                 if best_bid:
-                    print_result("  Best Bid", f"¥{best_bid:.2f}")
+                    print_detail("Best Bid", f"¥{best_bid:.2f}")
                 else:
-                    print_result("  Best Bid", "None")
+                    print_detail("Best Bid", "None")
                 
-                print_result("  Order Count", order_count)
+                print_detail("Order Count", order_count)
                 
                 # Show sample orders
                 orders = buy_result.get('orders', [])
-                if orders:
-                    print("\n  Sample orders (top 3):")
+                if orders and not QUIET:
+                    emit("\n  Sample orders (top 3):")
                     for i, order in enumerate(orders[:3], 1):
                         price = order.get('price', 'N/A')
-                        print(f"    {i}. Price: ¥{price}")
+                        emit(f"    {i}. Price: ¥{price}")
             else:
                 print_result("✗ Status", "FAILED")
                 if buy_result:
-                    print_result("  HTTP Status", buy_result.get('status_code', 'N/A'))
+                    print_detail("HTTP Status", buy_result.get('status_code', 'N/A'))
                 else:
-                    print_result("  Error", "No response")
+                    print_detail("Error", "No response")
         else:
             print_result("✗ Status", "FAILED - No items found")
-            print_result("  Note", "Search may require authentication or item may not exist")
-            print_result("  Tip", "Try setting BUFF_COOKIE in .env file")
-            print_result("  Tip", "Or use a known goods_id directly for testing")
+            print_detail("Note", "Search may require authentication or item may not exist")
+            print_detail("Tip", "Try setting BUFF_COOKIE in .env file")
+            print_detail("Tip", "Or use a known goods_id directly for testing")
             
             # Try with a known goods_id for testing (if available)
             # Note: This would need to be updated with actual goods_id
-            print("\n  Attempting direct goods_id test (if available)...")
+            emit("\n  Attempting direct goods_id test (if available)...")
             # For now, we'll skip this but show how it would work
-            print("  (Skipping - would need actual goods_id)")
+            emit("  (Skipping - would need actual goods_id)")
     else:
         print_result("✗ Status", "FAILED")
         if search_result:
-            print_result("  HTTP Status", search_result.get('status_code', 'N/A'))
+            print_detail("HTTP Status", search_result.get('status_code', 'N/A'))
             data = search_result.get('data', {})
             if isinstance(data, dict):
                 if 'code' in data:
-                    print_result("  API Code", data.get('code'))
+                    print_detail("API Code", data.get('code'))
                 if 'msg' in data:
-                    print_result("  API Message", data.get('msg'))
+                    print_detail("API Message", data.get('msg'))
         else:
-            print_result("  Error", "No response - check network connection")
+            print_detail("Error", "No response - check network connection")
     
     return True
 
 
+def test_buff_fetcher():
+    """Test Buff marketplace fetcher."""
+    _, _, fetcher, results = asyncio.run(run_probes(steam=False))
+    ok = report_buff(fetcher, results)
+    flush_output()
+    return ok
+
+
 def explain_buff_workflow():
     """Explain how Buff data pulling works."""
     print_section("How Buff Data Pulling Works")
     
-    print("""
+    emit("""
   Buff marketplace uses a multi-step process:
   
   1. SEARCH (find goods_id):
@@ -268,7 +361,7 @@ def explain_buff_workflow():
   Rate Limiting:
   - Default: 20 requests/minute
   - Enforced with exponential backoff on errors
-  - Minimum interval between requests calculated automatically
+  - Token bucket: bursts up to one minute's budget, then refills steadily
   
   Authentication:
   - Optional but recommended for better results
@@ -280,18 +373,19 @@ def explain_buff_workflow():
 
 def main():
     """Main test function."""
-    print("\n" + "=" * 70)
-    print("  CS2 Arbitrage System - Fetcher Test Suite")
-    print("=" * 70)
+    emit("\n" + "=" * 70)
+    emit("  CS2 Arbitrage System - Fetcher Test Suite")
+    emit("=" * 70)
     
-    # Explain Buff workflow first
-    explain_buff_workflow()
+    # Explain Buff workflow first (static text, skipped under --quiet)
+    if not QUIET:
+        explain_buff_workflow()
     
-    # Test Steam
-    steam_ok = test_steam_fetcher()
+    # Run all Steam and Buff probes concurrently, then report in order
+    steam_fetcher, steam_results, buff_fetcher, buff_results = asyncio.run(run_probes())
     
-    # Test Buff
-    buff_ok = test_buff_fetcher()
+    steam_ok = report_steam(steam_fetcher, steam_results)
+    buff_ok = report_buff(buff_fetcher, buff_results)
     
     # Summary
     print_section("Test Summary")
@@ -299,21 +393,30 @@ def main():
     print_result("Steam Fetcher", "✓ PASSED" if steam_ok else "✗ FAILED")
     print_result("Buff Fetcher", "✓ PASSED" if buff_ok else "✗ FAILED")
     
-    print("\n  Notes:")
-    print("    - Steam: Public API, no authentication required")
-    print("    - Buff: May require authentication for some endpoints")
-    print("    - Set BUFF_COOKIE in .env file for better Buff results")
-    print("    - Rate limits are automatically enforced")
-    print()
+    if not QUIET:
+        emit("\n  Notes:")
+        emit("    - Steam: Public API, no authentication required")
+        emit("    - Buff: May require authentication for some endpoints")
+        emit("    - Set BUFF_COOKIE in .env file for better Buff results")
+        emit("    - Rate limits are automatically enforced")
+        emit()
     
+    flush_output()
     return steam_ok and buff_ok
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Test Steam and Buff fetchers')
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help='Only print pass/fail lines, skip workflow explanation and details')
+    args = parser.parse_args()
+    QUIET = args.quiet
+    
     try:
         success = main()
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
+        flush_output()
         print("\n\nTest interrupted by user.")
         sys.exit(1)
     except Exception as e:
@@ -0,0 +1,230 @@
+"""Compiled Monte Carlo kernels for hold period risk.
+
+Numba is optional. Without it the kernels still run as plain Python (slow),
+so callers should check NUMBA_AVAILABLE and prefer the NumPy path instead.
+"""
+
+import math
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on environment
+    NUMBA_AVAILABLE = False
+    prange = range
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# Samples per independently seeded block in simulate_pnl
+SEED_CHUNK = 16384
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def simulate_pnl(
+    current_price: float,
+    volatility: float,
+    hold_days: int,
+    tc: float,
+    buff_ask: float,
+    drift: float,
+    seed: int,
+    out: np.ndarray
+):
+    """Simulate PnL after hold period into `out` in one fused parallel loop.
+    
+    RNG, exp, fee adjustment, sign test and sums all happen per sample with
+    no intermediate arrays. Worker threads have their own RNG state, and
+    seeding it once only fixes the calling thread's stream. Instead, each
+    block of SEED_CHUNK samples reseeds from seed and its index, so the
+    samples (and sums) depend only on seed, not on thread count or
+    scheduling.
+    
+    Args:
+        current_price: Current Steam bid
+        volatility: Daily volatility (as decimal)
+        hold_days: Holding period in days
+        tc: Steam transaction cost
+        buff_ask: Buff ask (net of fees)
+        drift: Expected daily return
+        seed: RNG seed
+        out: Preallocated float64 array, filled with simulated PnL
+    
+    Returns:
+        Tuple of (sum of PnL, count of positive PnL samples)
+    """
+    sigma_sqrtT = volatility * math.sqrt(hold_days)
+    mean = (drift - 0.5 * volatility**2) * hold_days
+    net_price = current_price * (1 - tc)
+    
+    n = out.shape[0]
+    n_chunks = (n + SEED_CHUNK - 1) // SEED_CHUNK
+    chunk_sums = np.zeros(n_chunks)
+    chunk_counts = np.zeros(n_chunks, dtype=np.int64)
+    for c in prange(n_chunks):
+        # Seeds the running thread's generator, whichever thread that is
+        np.random.seed((seed + c) & 0xFFFFFFFF)
+        sum_pnl = 0.0
+        count_positive = 0
+        for i in range(c * SEED_CHUNK, min((c + 1) * SEED_CHUNK, n)):
+            pnl = net_price * math.exp(mean + sigma_sqrtT * np.random.standard_normal()) - buff_ask
+            out[i] = pnl
+            sum_pnl += pnl
+            if pnl > 0:
+                count_positive += 1
+        chunk_sums[c] = sum_pnl
+        chunk_counts[c] = count_positive
+    
+    # Summed in chunk order, so the total doesn't depend on scheduling either
+    return chunk_sums.sum(), chunk_counts.sum()
+
+
+@njit(fastmath=True, cache=True)
+def reduce_pnl(pnl: np.ndarray):
+    """Sum and count of positive PnL samples in a single pass.
+    
+    Replaces separate np.mean(pnl) and np.mean(pnl > 0) sweeps. The sum is
+    accumulated in float64 even for float32 samples.
+    
+    Returns:
+        Tuple of (sum of PnL, count of positive PnL samples)
+    """
+    sum_pnl = 0.0
+    count_positive = 0
+    for i in range(pnl.shape[0]):
+        x = pnl[i]
+        sum_pnl += x
+        if x > 0:
+            count_positive += 1
+    return sum_pnl, count_positive
+
+
+@njit(cache=True)
+def _p2_init(p: float, first: np.ndarray, heights: np.ndarray, pos: np.ndarray,
+             desired: np.ndarray, incr: np.ndarray):
+    """Initialize P² quantile state from the first five (sorted) observations."""
+    for i in range(5):
+        heights[i] = first[i]
+        pos[i] = i + 1
+    desired[0] = 1.0
+    desired[1] = 1.0 + 2.0 * p
+    desired[2] = 1.0 + 4.0 * p
+    desired[3] = 3.0 + 2.0 * p
+    desired[4] = 5.0
+    incr[0] = 0.0
+    incr[1] = p / 2.0
+    incr[2] = p
+    incr[3] = (1.0 + p) / 2.0
+    incr[4] = 1.0
+
+
+@njit(cache=True)
+def _p2_update(x: float, heights: np.ndarray, pos: np.ndarray,
+               desired: np.ndarray, incr: np.ndarray):
+    """Feed one observation into a P² quantile estimator (Jain & Chlamtac, 1985).
+    
+    Keeps five markers whose middle height tracks the p-quantile, so memory
+    is O(1) and no sort is ever needed.
+    """
+    # Find the cell containing x, extending the extremes if needed
+    if x < heights[0]:
+        heights[0] = x
+        k = 0
+    elif x < heights[1]:
+        k = 0
+    elif x < heights[2]:
+        k = 1
+    elif x < heights[3]:
+        k = 2
+    elif x <= heights[4]:
+        k = 3
+    else:
+        heights[4] = x
+        k = 3
+    
+    for i in range(k + 1, 5):
+        pos[i] += 1.0
+    for i in range(5):
+        desired[i] += incr[i]
+    
+    # Adjust the three middle markers toward their desired positions
+    for i in range(1, 4):
+        d = desired[i] - pos[i]
+        if (d >= 1.0 and pos[i + 1] - pos[i] > 1.0) or (d <= -1.0 and pos[i - 1] - pos[i] < -1.0):
+            s = 1.0 if d > 0 else -1.0
+            # Piecewise-parabolic prediction
+            hp = heights[i] + s / (pos[i + 1] - pos[i - 1]) * (
+                (pos[i] - pos[i - 1] + s) * (heights[i + 1] - heights[i]) / (pos[i + 1] - pos[i])
+                + (pos[i + 1] - pos[i] - s) * (heights[i] - heights[i - 1]) / (pos[i] - pos[i - 1])
+            )
+            if heights[i - 1] < hp < heights[i + 1]:
+                heights[i] = hp
+            else:
+                # Fall back to linear prediction
+                j = i + int(s)
+                heights[i] = heights[i] + s * (heights[j] - heights[i]) / (pos[j] - pos[i])
+            pos[i] += s
+
+
+@njit(fastmath=True, cache=True)
+def simulate_pnl_streaming(
+    current_price: float,
+    volatility: float,
+    hold_days: int,
+    tc: float,
+    buff_ask: float,
+    drift: float,
+    seed: int,
+    n_sim: int
+):
+    """Simulate PnL after hold period without storing the samples.
+    
+    Mean, P(pnl > 0) and the minimum are accumulated inline, and the 1st and
+    5th percentiles are tracked with P² estimators, so memory is O(1) and no
+    sort or partition pass is needed. The P² update depends on sample order,
+    so this loop is sequential. Requires n_sim >= 5.
+    
+    Returns:
+        Tuple of (sum of PnL, count of positive PnL, 1st percentile,
+        5th percentile, minimum PnL)
+    """
+    np.random.seed(seed)
+    
+    sigma_sqrtT = volatility * math.sqrt(hold_days)
+    mean = (drift - 0.5 * volatility**2) * hold_days
+    net_price = current_price * (1 - tc)
+    
+    # Marker state for the 1st (row 0) and 5th (row 1) percentiles
+    heights = np.empty((2, 5))
+    pos = np.empty((2, 5))
+    desired = np.empty((2, 5))
+    incr = np.empty((2, 5))
+    
+    first = np.empty(5)
+    sum_pnl = 0.0
+    count_positive = 0
+    min_pnl = np.inf
+    for i in range(n_sim):
+        pnl = net_price * math.exp(mean + sigma_sqrtT * np.random.standard_normal()) - buff_ask
+        sum_pnl += pnl
+        if pnl > 0:
+            count_positive += 1
+        if pnl < min_pnl:
+            min_pnl = pnl
+        
+        if i < 5:
+            first[i] = pnl
+            if i == 4:
+                first.sort()
+                _p2_init(0.01, first, heights[0], pos[0], desired[0], incr[0])
+                _p2_init(0.05, first, heights[1], pos[1], desired[1], incr[1])
+        else:
+            _p2_update(pnl, heights[0], pos[0], desired[0], incr[0])
+            _p2_update(pnl, heights[1], pos[1], desired[1], incr[1])
+    
+    return sum_pnl, count_positive, heights[0, 2], heights[1, 2], min_pnl
@@ -1,11 +1,59 @@
 """Risk analysis and Monte Carlo simulation for holding period."""
 
+import math
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 import logging
+from src.analysis.kernels import NUMBA_AVAILABLE, reduce_pnl, simulate_pnl, simulate_pnl_streaming
+
+# Optional C extension, built with `cythonize -i src/analysis/risk_c.pyx`
+try:
+    from src.analysis.risk_c import analyze_item as _analyze_item_c
+    CYTHON_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on build
+    CYTHON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+_STD_NORMAL = NormalDist()
+
+# Integer action codes used by the batch methods, so filters are plain masks
+# (e.g. actions == CANDIDATE). ACTION_NAMES maps a code back to its label.
+SKIP = 0
+MONITOR = 1
+CANDIDATE = 2
+ACTION_NAMES = ('skip', 'monitor', 'candidate')
+
+
+def _partition_percentiles(a: np.ndarray, percentiles: List[float]) -> np.ndarray:
+    """Percentiles along the last axis via np.partition instead of a full sort.
+    
+    Uses the same linear interpolation as np.percentile, so results match it,
+    but only the order statistics around each requested percentile are placed.
+    
+    Args:
+        a: Array of samples (last axis is reduced)
+        percentiles: Percentiles in [0, 100]
+        
+    Returns:
+        Array of shape (len(percentiles),) + a.shape[:-1]
+    """
+    n = a.shape[-1]
+    pos = np.asarray(percentiles, dtype=float) / 100.0 * (n - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.minimum(lo + 1, n - 1)
+    frac = pos - lo
+    
+    part = np.partition(a, np.unique(np.concatenate([lo, hi])), axis=-1)
+    lo_vals = np.take(part, lo, axis=-1)
+    hi_vals = np.take(part, hi, axis=-1)
+    result = lo_vals + (hi_vals - lo_vals) * frac
+    
+    # Move the percentile axis to the front like np.percentile does
+    return np.moveaxis(result, -1, 0)
+
 
 class RiskAnalyzer:
     """Analyzes risk during forced holding period."""
@@ -13,16 +61,34 @@ class RiskAnalyzer:
     def __init__(
         self,
         tc_steam: float = 0.15,
-        default_exec_prob: float = 0.6
+        default_exec_prob: float = 0.6,
+        dtype=np.float32,
+        seed: Optional[Union[int, np.random.SeedSequence]] = None
     ):
         """Initialize risk analyzer.
         
         Args:
             tc_steam: Steam transaction cost (default 15%)
             default_exec_prob: Default execution probability (guess, need to validate)
+            dtype: Float type for Monte Carlo samples. float32 halves memory
+                traffic and percentiles only need ~1e-3 relative accuracy.
+            seed: Seed (or SeedSequence) for reproducible simulations.
+                None draws fresh entropy from the OS.
         """
         self.tc_steam = tc_steam
         self.default_exec_prob = default_exec_prob  # Conservative guess
+        self.dtype = np.dtype(dtype)
+        
+        # Reused across simulations so each call doesn't allocate a fresh array
+        if isinstance(seed, np.random.SeedSequence):
+            self._seed_seq = seed
+        else:
+            self._seed_seq = np.random.SeedSequence(seed)
+        self._rng = np.random.default_rng(self._seed_seq)
+        self._z_buf = np.empty(10000, dtype=self.dtype)
+        
+        # Running log-return stats per item for incremental volatility
+        self._vol_state: Dict[int, Dict[str, float]] = {}
     
     def calculate_pnl_now(
         self,
@@ -38,8 +104,24 @@ class RiskAnalyzer:
         Returns:
             Current PnL
         """
-        adj_steam_bid = steam_bid * (1 - self.tc_steam)
-        return adj_steam_bid - buff_ask
+        return float(self.calculate_pnl_now_batch(steam_bid, buff_ask))
+    
+    def calculate_pnl_now_batch(
+        self,
+        steam_bids: np.ndarray,
+        buff_asks: np.ndarray
+    ) -> np.ndarray:
+        """Calculate current PnL for many candidates at once.
+        
+        Args:
+            steam_bids: Best bids on Steam, shape (N,)
+            buff_asks: Best asks on Buff (net of fees), shape (N,)
+            
+        Returns:
+            Array of current PnL, shape (N,)
+        """
+        steam_bids = np.asarray(steam_bids, dtype=float)
+        return steam_bids * (1 - self.tc_steam) - buff_asks
     
     def calculate_spread_pct(
         self,
@@ -55,9 +137,29 @@ class RiskAnalyzer:
         Returns:
             Spread as percentage
         """
-        if buff_ask == 0:
-            return 0.0
-        return (pnl / buff_ask) * 100
+        return float(self.calculate_spread_pct_batch(pnl, buff_ask))
+    
+    def calculate_spread_pct_batch(
+        self,
+        pnls: np.ndarray,
+        buff_asks: np.ndarray
+    ) -> np.ndarray:
+        """Calculate spread percentage for many candidates at once.
+        
+        Args:
+            pnls: Profit and loss, shape (N,)
+            buff_asks: Best asks on Buff, shape (N,)
+            
+        Returns:
+            Array of spreads as percentage, 0.0 where buff_ask is 0
+        """
+        pnls = np.asarray(pnls, dtype=float)
+        buff_asks = np.asarray(buff_asks, dtype=float)
+        
+        spread = np.zeros(np.broadcast(pnls, buff_asks).shape)
+        np.divide(pnls, buff_asks, out=spread, where=buff_asks != 0)
+        spread *= 100
+        return spread
     
     def calculate_volatility(
         self,
@@ -73,32 +175,68 @@ class RiskAnalyzer:
         Returns:
             Daily volatility (as decimal, e.g., 0.20 for 20%)
         """
-        if len(prices) < 2:
+        # Sample std needs at least two returns
+        if len(prices) < 3:
             return 0.0
         
-        prices_array = np.array(prices)
+        prices_array = np.asarray(prices, dtype=float)
         
         if method == 'log_returns':
-            # Log returns: ln(P_t / P_{t-1})
-            returns = np.diff(np.log(prices_array))
+            # Log returns: ln(P_t / P_{t-1}), one N-1 array instead of log + diff
+            returns = np.log(prices_array[1:] / prices_array[:-1])
         else:
             # Simple returns: (P_t - P_{t-1}) / P_{t-1}
             returns = np.diff(prices_array) / prices_array[:-1]
         
-        # Calculate standard deviation
-        std_dev = np.std(returns)
+        # Calculate standard deviation (sample, same as update_and_get_volatility)
+        std_dev = np.std(returns, ddof=1)
         
         # Return as daily volatility
         # TODO: should probably annualize this properly but keeping it simple for now
         return float(std_dev)
     
+    def update_and_get_volatility(self, item_id: int, new_price: float) -> float:
+        """Add a new price for an item and return its updated volatility.
+        
+        Incremental version of calculate_volatility(method='log_returns'):
+        keeps running log-return stats per item (Welford's algorithm) so each
+        update is O(1) instead of recomputing over the whole price history.
+        
+        Args:
+            item_id: Item the price belongs to
+            new_price: Latest observed price
+            
+        Returns:
+            Daily volatility (sample std of log returns, 0.0 until 2 returns)
+        """
+        log_price = math.log(new_price)
+        state = self._vol_state.get(item_id)
+        
+        if state is None:
+            self._vol_state[item_id] = {
+                'n': 0, 'mean': 0.0, 'm2': 0.0, 'last_log_price': log_price
+            }
+            return 0.0
+        
+        ret = log_price - state['last_log_price']
+        state['last_log_price'] = log_price
+        state['n'] += 1
+        delta = ret - state['mean']
+        state['mean'] += delta / state['n']
+        state['m2'] += delta * (ret - state['mean'])
+        
+        if state['n'] < 2:
+            return 0.0
+        return math.sqrt(state['m2'] / (state['n'] - 1))
+    
     def monte_carlo_simulation(
         self,
         current_price: float,
         volatility: float,
         hold_days: int,
         n_simulations: int = 10000,
-        drift: float = 0.0
+        drift: float = 0.0,
+        sampling: str = 'antithetic'
     ) -> np.ndarray:
         """Monte Carlo simulation of price after holding period.
         
@@ -110,33 +248,74 @@ class RiskAnalyzer:
             hold_days: Holding period in days
             n_simulations: Number of Monte Carlo simulations
             drift: Expected daily return (default 0 for short-term)
+            sampling: How Z is drawn:
+                'antithetic' - pairs of (z, -z), lower variance for same N
+                'sobol' - scrambled Sobol quasi-random points (needs scipy)
+                'pseudo' - plain pseudo-random normals
             
         Returns:
-            Array of simulated prices after hold period
+            Array of simulated prices after hold period. This is an internal
+            buffer that gets overwritten by the next call, copy it if needed.
         """
-        # Generate random normal variates
-        Z = np.random.normal(0, 1, n_simulations)
+        # Resize the reusable buffer only when the sample count changes
+        if self._z_buf.shape[0] != n_simulations:
+            self._z_buf = np.empty(n_simulations, dtype=self.dtype)
         
-        # Time in years (approximate)
-        T = hold_days / 365.0
+        # Generate random normal variates in place
+        Z = self._draw_normals(self._z_buf, sampling)
         
-        # Log-normal model
-        # Price_T = Price_0 * exp(µ*T - 0.5σ²T + σ√T * Z)
-        # For daily volatility, we need to scale appropriately
-        # If volatility is daily, then for T days: σ_total = σ_daily * sqrt(T)
+        return self._normals_to_prices(Z, current_price, volatility, hold_days, drift)
+    
+    @staticmethod
+    def _normals_to_prices(
+        Z: np.ndarray,
+        current_price: float,
+        volatility: float,
+        hold_days: int,
+        drift: float
+    ) -> np.ndarray:
+        """Turn standard normals into log-normal prices in place, keeping Z's dtype."""
+        # Log-normal model with daily volatility:
+        # for T days, σ_total = σ_daily * sqrt(T)
+        # Constants are cast to Z's dtype so float32 buffers stay float32
+        to_dtype = Z.dtype.type
+        sigma_sqrtT = to_dtype(volatility * math.sqrt(hold_days))
+        mean = to_dtype((drift - 0.5 * volatility**2) * hold_days)
         
-        # Convert daily volatility to holding period volatility
-        sigma_total = volatility * np.sqrt(hold_days)
+        # Price_T = Price_0 * exp(mean + σ√T * Z), fused in place (no temporaries)
+        np.multiply(Z, sigma_sqrtT, out=Z)
+        Z += mean
+        np.exp(Z, out=Z)
+        Z *= to_dtype(current_price)
         
-        # Simulate prices
-        price_multiplier = np.exp(
-            drift * hold_days - 0.5 * volatility**2 * hold_days + 
-            volatility * np.sqrt(hold_days) * Z
-        )
+        return Z
+    
+    def _draw_normals(self, Z: np.ndarray, sampling: str) -> np.ndarray:
+        """Fill Z with standard normal variates using the given sampling scheme."""
+        n = Z.shape[0]
         
-        simulated_prices = current_price * price_multiplier
+        if sampling == 'antithetic':
+            # Draw half, mirror the other half; odd N gets one extra plain draw
+            half = n // 2
+            self._rng.standard_normal(dtype=Z.dtype, out=Z[:half])
+            np.negative(Z[:half], out=Z[half:2 * half])
+            if n % 2:
+                Z[-1] = self._rng.standard_normal()
+        elif sampling == 'sobol':
+            from scipy.stats import qmc
+            from scipy.special import ndtri
+            
+            # Sobol is balanced on powers of two, so draw the next one up
+            m = max(int(np.ceil(np.log2(n))), 0)
+            sobol = qmc.Sobol(d=1, scramble=True, seed=self._rng)
+            u = sobol.random_base2(m)[:n, 0]
+            ndtri(u, out=Z)
+        elif sampling == 'pseudo':
+            self._rng.standard_normal(dtype=Z.dtype, out=Z)
+        else:
+            raise ValueError(f"Unknown sampling method: {sampling}")
         
-        return simulated_prices
+        return Z
     
     def analyze_hold_period_risk(
         self,
@@ -145,7 +324,8 @@ class RiskAnalyzer:
         volatility: float,
         hold_days: int,
         n_simulations: int = 10000,
-        drift: float = 0.0
+        drift: float = 0.0,
+        method: str = 'closed_form'
     ) -> Dict[str, float]:
         """Analyze risk during holding period.
         
@@ -156,6 +336,11 @@ class RiskAnalyzer:
             hold_days: Expected holding period in days
             n_simulations: Number of Monte Carlo simulations
             drift: Expected daily return
+            method: 'closed_form' (default), 'monte_carlo', 'numba'
+                (compiled Monte Carlo), 'streaming' (compiled Monte Carlo
+                with P² percentiles, no sample array) or 'cython' (C
+                extension, no per-call NumPy overhead). The compiled methods
+                fall back to 'monte_carlo' without numba or the C extension.
             
         Returns:
             Dictionary with risk metrics:
@@ -165,23 +350,65 @@ class RiskAnalyzer:
             - var_99: 99% Value at Risk
             - worst_case: Worst case PnL (1st percentile)
         """
-        # Simulate Steam prices after hold period
-        simulated_steam_prices = self.monte_carlo_simulation(
-            steam_bid, volatility, hold_days, n_simulations, drift
-        )
+        if method == 'closed_form':
+            return self.analyze_hold_period_risk_closed_form(
+                steam_bid, buff_ask, volatility, hold_days, n_simulations, drift
+            )
         
-        # Calculate adjusted Steam bids (after fee)
-        adj_steam_bids = simulated_steam_prices * (1 - self.tc_steam)
+        if method == 'cython' and CYTHON_AVAILABLE:
+            return _analyze_item_c(
+                steam_bid, buff_ask, volatility, hold_days, self.tc_steam, drift,
+                n_simulations, int(self._rng.integers(2**63))
+            )
         
-        # Calculate PnL for each simulation
-        pnl_simulations = adj_steam_bids - buff_ask
+        if method == 'streaming' and NUMBA_AVAILABLE and n_simulations >= 5:
+            sum_pnl, count_positive, var_99, var_95, worst_case = simulate_pnl_streaming(
+                steam_bid, volatility, hold_days, self.tc_steam, buff_ask, drift,
+                int(self._rng.integers(2**31)), n_simulations
+            )
+            return {
+                'prob_positive': count_positive / n_simulations,
+                'expected_pnl': sum_pnl / n_simulations,
+                'var_95': float(var_95),
+                'var_99': float(var_99),
+                'worst_case': float(worst_case),
+                'current_pnl': self.calculate_pnl_now(steam_bid, buff_ask)
+            }
         
-        # Calculate metrics
-        prob_positive = float(np.mean(pnl_simulations > 0))
-        expected_pnl = float(np.mean(pnl_simulations))
-        var_95 = float(np.percentile(pnl_simulations, 5))  # 5th percentile (loss)
-        var_99 = float(np.percentile(pnl_simulations, 1))  # 1st percentile (loss)
-        worst_case = float(np.min(pnl_simulations))
+        if method == 'numba' and NUMBA_AVAILABLE:
+            pnl_simulations = np.empty(n_simulations)
+            sum_pnl, count_positive = simulate_pnl(
+                steam_bid, volatility, hold_days, self.tc_steam, buff_ask, drift,
+                int(self._rng.integers(2**31)), pnl_simulations
+            )
+            prob_positive = count_positive / n_simulations
+            expected_pnl = sum_pnl / n_simulations
+        else:
+            # Simulate Steam prices after hold period
+            simulated_steam_prices = self.monte_carlo_simulation(
+                steam_bid, volatility, hold_days, n_simulations, drift
+            )
+            
+            # Calculate adjusted Steam bids (after fee)
+            to_dtype = simulated_steam_prices.dtype.type
+            adj_steam_bids = simulated_steam_prices * to_dtype(1 - self.tc_steam)
+            
+            # Calculate PnL for each simulation
+            pnl_simulations = adj_steam_bids - to_dtype(buff_ask)
+            
+            # Calculate metrics (accumulate the mean in float64)
+            if NUMBA_AVAILABLE:
+                sum_pnl, count_positive = reduce_pnl(pnl_simulations)
+                prob_positive = count_positive / n_simulations
+                expected_pnl = float(sum_pnl / n_simulations)
+            else:
+                prob_positive = float(np.mean(pnl_simulations > 0))
+                expected_pnl = float(np.mean(pnl_simulations, dtype=np.float64))
+        
+        # Minimum, 1st and 5th percentiles from one partition (no full sort)
+        worst_case, var_99, var_95 = (
+            float(v) for v in _partition_percentiles(pnl_simulations, [0, 1, 5])
+        )
         
         return {
             'prob_positive': prob_positive,
@@ -192,6 +419,162 @@ class RiskAnalyzer:
             'current_pnl': self.calculate_pnl_now(steam_bid, buff_ask)
         }
     
+    def analyze_hold_period_risk_closed_form(
+        self,
+        steam_bid: float,
+        buff_ask: float,
+        volatility: float,
+        hold_days: int,
+        n_simulations: int = 10000,
+        drift: float = 0.0
+    ) -> Dict[str, float]:
+        """Analyze risk during holding period analytically.
+        
+        PnL after hold is an affine transform of a log-normal price, so the
+        metrics the Monte Carlo path estimates have exact expressions:
+        
+            ln(S_T / S_0) ~ N(µ, σT²),  µ = (drift - 0.5σ²)T,  σT = σ√T
+            P(pnl > 0) = Φ((µ - ln k) / σT),  k = buff_ask / ((1 - tc) * S_0)
+            E[pnl] = (1 - tc) * S_0 * exp(µ + 0.5σT²) - buff_ask
+        
+        Args:
+            steam_bid: Current best bid on Steam
+            buff_ask: Current best ask on Buff (net of fees)
+            volatility: Daily volatility of Steam price
+            hold_days: Expected holding period in days
+            n_simulations: Only used for worst_case, which is taken at the
+                1/(n+1) quantile to stay comparable with the Monte Carlo minimum
+            drift: Expected daily return
+            
+        Returns:
+            Same dictionary as analyze_hold_period_risk
+        """
+        net_bid = steam_bid * (1 - self.tc_steam)
+        mu = (drift - 0.5 * volatility**2) * hold_days
+        sigma_T = volatility * math.sqrt(hold_days)
+        
+        def pnl_quantile(q: float) -> float:
+            z = _STD_NORMAL.inv_cdf(q) if sigma_T > 0 else 0.0
+            return net_bid * math.exp(mu + sigma_T * z) - buff_ask
+        
+        if net_bid <= 0:
+            prob_positive = 0.0
+        elif buff_ask <= 0:
+            prob_positive = 1.0
+        else:
+            log_k = math.log(buff_ask / net_bid)
+            if sigma_T > 0:
+                prob_positive = _STD_NORMAL.cdf((mu - log_k) / sigma_T)
+            else:
+                prob_positive = 1.0 if mu > log_k else 0.0
+        
+        expected_pnl = net_bid * math.exp(mu + 0.5 * sigma_T**2) - buff_ask
+        
+        return {
+            'prob_positive': float(prob_positive),
+            'expected_pnl': float(expected_pnl),
+            'var_95': pnl_quantile(0.05),
+            'var_99': pnl_quantile(0.01),
+            'worst_case': pnl_quantile(1.0 / (n_simulations + 1)),
+            'current_pnl': self.calculate_pnl_now(steam_bid, buff_ask)
+        }
+    
+    def analyze_hold_period_risk_batch(
+        self,
+        steam_bids: np.ndarray,
+        buff_asks: np.ndarray,
+        vols: np.ndarray,
+        hold_days,
+        n_simulations: int = 10000,
+        drift: float = 0.0
+    ) -> Dict[str, np.ndarray]:
+        """Monte Carlo hold period risk for many items in one vectorized call.
+        
+        All items share one draw of standard normals, so the simulation is a
+        single (N, n_simulations) broadcast instead of N separate runs.
+        Memory is N * n_simulations floats, so chunk very large N.
+        
+        Args:
+            steam_bids: Current best bids on Steam, shape (N,)
+            buff_asks: Current best asks on Buff (net of fees), shape (N,)
+            vols: Daily volatilities, shape (N,)
+            hold_days: Holding period in days, scalar or shape (N,)
+            n_simulations: Number of Monte Carlo simulations per item
+            drift: Expected daily return
+            
+        Returns:
+            Dictionary with the same keys as analyze_hold_period_risk,
+            each an array of shape (N,)
+        """
+        steam_bids = np.asarray(steam_bids, dtype=float)
+        buff_asks = np.asarray(buff_asks, dtype=float)
+        vols = np.asarray(vols, dtype=float)
+        hold_days = np.broadcast_to(np.asarray(hold_days, dtype=float), steam_bids.shape)
+        
+        sigma_sqrtT = vols * np.sqrt(hold_days)
+        mean = (drift - 0.5 * vols**2) * hold_days
+        
+        Z = self._rng.standard_normal(n_simulations)
+        
+        # (N, n_simulations) matrix of simulated PnL, built in place
+        pnl = sigma_sqrtT[:, None] * Z[None, :]
+        pnl += mean[:, None]
+        np.exp(pnl, out=pnl)
+        pnl *= (steam_bids * (1 - self.tc_steam))[:, None]
+        pnl -= buff_asks[:, None]
+        
+        var_99, var_95 = _partition_percentiles(pnl, [1, 5])
+        
+        return {
+            'prob_positive': np.mean(pnl > 0, axis=1),
+            'expected_pnl': np.mean(pnl, axis=1),
+            'var_95': var_95,
+            'var_99': var_99,
+            'worst_case': np.min(pnl, axis=1),
+            'current_pnl': steam_bids * (1 - self.tc_steam) - buff_asks
+        }
+    
+    def analyze_many(
+        self,
+        items: Sequence[Tuple[float, float, float]],
+        hold_days: int,
+        n_simulations: int = 10000,
+        drift: float = 0.0,
+        method: str = 'monte_carlo',
+        max_workers: Optional[int] = None
+    ) -> List[Dict[str, float]]:
+        """Run analyze_hold_period_risk for many items on a thread pool.
+        
+        Each item gets its own child SeedSequence (spawned from this
+        analyzer's seed) and its own RiskAnalyzer, so workers never share an
+        RNG or sample buffer. With a fixed seed, results are reproducible per
+        item position regardless of thread scheduling.
+        
+        Args:
+            items: Sequence of (steam_bid, buff_ask, volatility) tuples
+            hold_days: Expected holding period in days
+            n_simulations: Number of Monte Carlo simulations per item
+            drift: Expected daily return
+            method: Same as analyze_hold_period_risk
+            max_workers: Thread pool size (ThreadPoolExecutor default if None)
+            
+        Returns:
+            List of risk metric dictionaries, in the same order as items
+        """
+        child_seeds = self._seed_seq.spawn(len(items))
+        
+        def run(item, child_seed):
+            steam_bid, buff_ask, volatility = item
+            worker = RiskAnalyzer(
+                self.tc_steam, self.default_exec_prob, self.dtype, seed=child_seed
+            )
+            return worker.analyze_hold_period_risk(
+                steam_bid, buff_ask, volatility, hold_days, n_simulations, drift, method
+            )
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(run, items, child_seeds))
+    
     def calculate_risk_score(
         self,
         expected_pnl: float,
@@ -244,16 +627,52 @@ class RiskAnalyzer:
         Returns:
             'candidate', 'monitor', or 'skip'
         """
-        if pnl_now < min_pnl:
-            return 'skip'
+        action = self.recommend_action_batch(
+            pnl_now, prob_positive, expected_pnl, min_pnl, min_prob_positive
+        )
+        return ACTION_NAMES[int(action)]
+    
+    def recommend_action_batch(
+        self,
+        pnl_now: np.ndarray,
+        prob_positive: np.ndarray,
+        expected_pnl: np.ndarray,
+        min_pnl: float = 0.5,
+        min_prob_positive: float = 0.6
+    ) -> np.ndarray:
+        """Recommend actions for many trade candidates at once.
         
-        if prob_positive < min_prob_positive:
-            return 'monitor'
+        Same rules as recommend_action, evaluated with boolean masks instead
+        of a branch per candidate. The comparisons write into two preallocated
+        boolean buffers rather than allocating one array per condition.
         
-        if expected_pnl < min_pnl:
-            return 'monitor'
+        Args:
+            pnl_now: Current PnL, shape (N,)
+            prob_positive: Probability of positive PnL after hold, shape (N,)
+            expected_pnl: Expected PnL after hold, shape (N,)
+            min_pnl: Minimum acceptable PnL
+            min_prob_positive: Minimum acceptable probability
+            
+        Returns:
+            Integer array of action codes (SKIP, MONITOR or CANDIDATE)
+        """
+        pnl_now = np.asarray(pnl_now)
+        prob_positive = np.asarray(prob_positive)
+        expected_pnl = np.asarray(expected_pnl)
+        shape = np.broadcast(pnl_now, prob_positive, expected_pnl).shape
+        
+        # monitor = (prob_positive < min_prob) | (expected_pnl < min_pnl)
+        monitor = np.empty(shape, dtype=bool)
+        buf = np.empty(shape, dtype=bool)
+        np.less(prob_positive, min_prob_positive, out=monitor)
+        np.less(expected_pnl, min_pnl, out=buf)
+        np.logical_or(monitor, buf, out=monitor)
         
-        return 'candidate'
+        # skip = pnl_now < min_pnl, reusing the scratch buffer. np.select takes
+        # the first matching condition, so skip wins over monitor.
+        skip = np.less(pnl_now, min_pnl, out=buf)
+        
+        return np.select([skip, monitor], [SKIP, MONITOR], default=CANDIDATE)
 
 
 if __name__ == "__main__":
@@ -284,4 +703,21 @@ if __name__ == "__main__":
     )
     
     print(f"Risk score: {risk_score:.2f}")
+    
+    # Same analysis for several items at once
+    batch_metrics = analyzer.analyze_hold_period_risk_batch(
+        np.array([10.0, 25.0, 4.0]),
+        np.array([8.5, 20.0, 3.6]),
+        np.array([0.05, 0.03, 0.08]),
+        hold_days
+    )
+    
+    print(f"Batch risk metrics: {batch_metrics}")
+    
+    actions = analyzer.recommend_action_batch(
+        batch_metrics['current_pnl'],
+        batch_metrics['prob_positive'],
+        batch_metrics['expected_pnl']
+    )
+    print(f"Batch actions: {[ACTION_NAMES[a] for a in actions]}")
 
@@ -2,49 +2,258 @@
 
 import sqlite3
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, List, Any
-from datetime import datetime
+from typing import Optional, Dict, List, Any, Tuple
+from datetime import datetime, timedelta, timezone
 import json
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
+try:
+    import orjson
+    _dumps = orjson.dumps  # Returns bytes, much faster than json.dumps
+except ImportError:  # pragma: no cover - depends on environment
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
 
 logger = logging.getLogger(__name__)
 
 
+def dict_factory(cursor: sqlite3.Cursor, row: Tuple) -> Dict[str, Any]:
+    """Build plain dicts directly, for rows handed back to callers."""
+    return dict(zip([col[0] for col in cursor.description], row))
+
+
+def utc_timestamp() -> str:
+    """Current UTC time for a timestamp column.
+    
+    Same format as CURRENT_TIMESTAMP plus milliseconds, so it sorts and
+    compares correctly against rows using the column default.
+    """
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
 class DatabaseClient:
     """SQLite database client for storing market data."""
     
-    def __init__(self, db_path: str = "db/arbitrage.sqlite"):
+    # Per-connection pragmas: fsync only at WAL checkpoints, ~64MB page
+    # cache, temp tables in memory and memory-mapped reads. Automatic WAL
+    # checkpoints every 10000 pages (~40MB) instead of 1000, so steady
+    # inserts stall on them less often.
+    CONNECTION_PRAGMAS = """
+        PRAGMA synchronous=NORMAL;
+        PRAGMA cache_size=-64000;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
+        PRAGMA wal_autocheckpoint=10000;
+    """
+    
+    # Seconds between maintenance() runs from maybe_run_maintenance()
+    MAINTENANCE_INTERVAL = 900
+    
+    # Rows carry the time they were fetched; a NULL timestamp falls back
+    # to the insert time
+    INSERT_STEAM_SNAPSHOT_SQL = """
+        INSERT INTO steam_snapshots 
+        (item_id, timestamp, best_bid, best_ask, volume_24h, volume_7d, 
+         median_price, lowest_price, highest_price, currency_id)
+        VALUES (?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    INSERT_BUFF_SNAPSHOT_SQL = """
+        INSERT INTO buff_snapshots 
+        (item_id, timestamp, best_ask, best_bid, volume_24h, volume_7d,
+         sell_order_count, buy_order_count, currency)
+        VALUES (?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    # Raw API responses live in a side table, compressed, so snapshot rows
+    # stay small for history queries
+    INSERT_RAW_RESPONSE_SQL = """
+        INSERT OR REPLACE INTO raw_responses (snapshot_id, source, codec, body)
+        VALUES (?, ?, ?, ?)
+    """
+    
+    INSERT_FETCH_LOG_SQL = """
+        INSERT INTO fetch_logs 
+        (source, endpoint, timestamp, status_code, latency_ms, success, error_message, item_id)
+        VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?)
+    """
+    
+    # Rows per transaction for the bulk insert methods
+    BULK_CHUNK_SIZE = 500
+    
+    # Prepared statements kept per connection (sqlite3 defaults to 128).
+    # The SQL constants above keep the statement text, and so the cache
+    # key, identical across calls.
+    CACHED_STATEMENTS = 256
+    
+    # Window functions need SQLite 3.25+; older builds join on MAX(timestamp)
+    WINDOW_FUNCTIONS = sqlite3.sqlite_version_info >= (3, 25, 0)
+    
+    # Newest snapshot per item and source, as CTEs s and b with r = 1
+    LATEST_WINDOW_CTE = """
+        WITH s AS (
+            SELECT item_id, timestamp, best_bid, volume_7d,
+                   ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY timestamp DESC) AS r
+            FROM steam_snapshots
+        ),
+        b AS (
+            SELECT item_id, timestamp, best_ask, volume_7d,
+                   ROW_NUMBER() OVER (PARTITION BY item_id ORDER BY timestamp DESC) AS r
+            FROM buff_snapshots
+        )
+    """
+    
+    # UNIQUE(item_id, timestamp) guarantees one row per MAX(timestamp)
+    LATEST_GROUPED_CTE = """
+        WITH s AS (
+            SELECT ss.item_id, ss.timestamp, ss.best_bid, ss.volume_7d, 1 AS r
+            FROM steam_snapshots ss
+            JOIN (SELECT item_id, MAX(timestamp) AS ts FROM steam_snapshots GROUP BY item_id) m
+              ON ss.item_id = m.item_id AND ss.timestamp = m.ts
+        ),
+        b AS (
+            SELECT bs.item_id, bs.timestamp, bs.best_ask, bs.volume_7d, 1 AS r
+            FROM buff_snapshots bs
+            JOIN (SELECT item_id, MAX(timestamp) AS ts FROM buff_snapshots GROUP BY item_id) m
+              ON bs.item_id = m.item_id AND bs.timestamp = m.ts
+        )
+    """
+    
+    def __init__(
+        self,
+        db_path: str = "db/arbitrage.sqlite",
+        store_raw: bool = True,
+        raw_codec: str = 'zlib'
+    ):
         """Initialize database client.
         
         Args:
             db_path: Path to SQLite database file
+            store_raw: Keep compressed raw API responses in raw_responses
+            raw_codec: 'zlib' or 'zstd' (needs the zstandard package, falls
+                back to zlib without it)
         """
         self.db_path = db_path
+        self.store_raw = store_raw
+        
+        if raw_codec == 'zstd' and zstandard is None:
+            if store_raw:
+                logger.warning("zstandard not installed, compressing raw responses with zlib")
+            raw_codec = 'zlib'
+        self.raw_codec = raw_codec
+        self._zstd = zstandard.ZstdCompressor(level=3) if raw_codec == 'zstd' else None
         # Ensure directory exists
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        # One long-lived connection shared by all methods, for the client's
+        # whole lifetime. Autocommit mode (isolation_level=None), transactions
+        # are explicit via transaction(). The lock serializes access since
+        # the connection is shared across threads.
+        self._conn = self._connect(check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
         self._ensure_schema()
+        
+        # market_hash_name -> item_id, stable for the lifetime of the process
+        self._item_id_cache: Dict[str, int] = {}
+        
+        self._last_maintenance = time.monotonic()
     
     def _ensure_schema(self):
-        """Ensure database schema exists."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Ensure database schema exists (on the shared connection)."""
+        with self.connection() as conn:
+            # Check if tables exist
+            cursor = conn.execute("""
+                SELECT name FROM sqlite_master 
+                WHERE type='table' AND name='items'
+            """)
+            
+            if not cursor.fetchone():
+                logger.warning("Schema not found. Run migrations/init_db.py first.")
+            
+            # WAL is persistent on the database file, so it only needs setting once
+            conn.execute("PRAGMA journal_mode=WAL")
+    
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, cached_statements=self.CACHED_STATEMENTS, **kwargs)
+        conn.row_factory = sqlite3.Row  # Return rows as dict-like objects
+        # Per-connection settings, fsync only at WAL checkpoints
+        conn.executescript(self.CONNECTION_PRAGMAS)
+        return conn
+    
+    def get_connection(self):
+        """Get a new, separate database connection (caller closes it).
+        
+        Internal methods use the shared connection via connection() instead.
+        """
+        return self._connect()
+    
+    @contextmanager
+    def connection(self):
+        """Borrow the shared connection, holding the lock for the block."""
+        with self._lock:
+            yield self._conn
+    
+    @contextmanager
+    def transaction(self):
+        """Run a block in a single transaction on the shared connection.
         
-        # Check if tables exist
-        cursor.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name='items'
-        """)
+        Nested use joins the outer transaction. The write lock is taken up
+        front (BEGIN IMMEDIATE), so a busy database fails at the start of the
+        block rather than partway through it.
+        """
+        with self._lock:
+            if self._conn.in_transaction:
+                yield self._conn
+                return
+            
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
+    def maintenance(self):
+        """Refresh query planner statistics and truncate the WAL.
         
-        if not cursor.fetchone():
-            logger.warning("Schema not found. Run migrations/init_db.py first.")
+        Blocks other users of the shared connection while it runs, so call
+        it between fetch cycles rather than during one.
+        """
+        with self._lock:
+            self._conn.execute("PRAGMA optimize")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._last_maintenance = time.monotonic()
+    
+    def maybe_run_maintenance(self) -> bool:
+        """Run maintenance() if MAINTENANCE_INTERVAL has passed since the last run.
         
-        conn.close()
+        Returns:
+            True if maintenance ran
+        """
+        if time.monotonic() - self._last_maintenance < self.MAINTENANCE_INTERVAL:
+            return False
+        self.maintenance()
+        return True
     
-    def get_connection(self):
-        """Get database connection."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dict-like objects
-        return conn
+    def close(self):
+        """Run PRAGMA optimize and close the shared connection.
+        
+        Call when the client is no longer needed (e.g. on daemon shutdown).
+        Optimize keeps the query planner's statistics fresh.
+        """
+        with self._lock:
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
     
     def get_or_create_item(self, market_hash_name: str, buff_goods_id: Optional[int] = None) -> int:
         """Get existing item ID or create new item.
@@ -56,38 +265,53 @@ class DatabaseClient:
         Returns:
             item_id: Database item ID
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Try to find existing item
-        cursor.execute("""
-            SELECT item_id FROM items 
-            WHERE market_hash_name = ?
-        """, (market_hash_name,))
-        
-        row = cursor.fetchone()
-        if row:
-            item_id = row['item_id']
-            # Update buff_goods_id if provided
-            if buff_goods_id:
-                cursor.execute("""
-                    UPDATE items 
-                    SET buff_goods_id = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE item_id = ?
-                """, (buff_goods_id, item_id))
-                conn.commit()
-        else:
-            # Create new item
-            cursor.execute("""
+        # Plain lookups are served from memory; a goods ID still needs a write
+        if buff_goods_id is None and market_hash_name in self._item_id_cache:
+            return self._item_id_cache[market_hash_name]
+        
+        # Single upsert: insert new names, refresh goods ID on existing ones
+        with self.connection() as conn:
+            cursor = conn.execute("""
                 INSERT INTO items (market_hash_name, buff_goods_id)
                 VALUES (?, ?)
+                ON CONFLICT(market_hash_name) DO UPDATE
+                SET buff_goods_id = COALESCE(excluded.buff_goods_id, items.buff_goods_id),
+                    updated_at = CURRENT_TIMESTAMP
+                RETURNING item_id
             """, (market_hash_name, buff_goods_id))
-            item_id = cursor.lastrowid
-            conn.commit()
+            item_id = cursor.fetchone()[0]
         
-        conn.close()
+        self._item_id_cache[market_hash_name] = item_id
         return item_id
     
+    def invalidate_item_cache(self):
+        """Forget cached market_hash_name -> item_id lookups."""
+        self._item_id_cache.clear()
+    
+    def bulk_upsert_items(self, rows: List[Tuple[str, Optional[int]]]) -> int:
+        """Insert or update many items in a single transaction.
+        
+        Same upsert as get_or_create_item per row: new names are inserted,
+        and existing items keep their buff_goods_id unless a new one is given.
+        
+        Args:
+            rows: List of (market_hash_name, buff_goods_id) tuples,
+                buff_goods_id may be None
+            
+        Returns:
+            Number of rows processed
+        """
+        with self.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO items (market_hash_name, buff_goods_id)
+                VALUES (?, ?)
+                ON CONFLICT(market_hash_name) DO UPDATE
+                SET buff_goods_id = COALESCE(excluded.buff_goods_id, items.buff_goods_id),
+                    updated_at = CURRENT_TIMESTAMP
+            """, rows)
+        
+        return len(rows)
+    
     def insert_steam_snapshot(
         self,
         item_id: int,
@@ -99,31 +323,23 @@ class DatabaseClient:
         lowest_price: Optional[float] = None,
         highest_price: Optional[float] = None,
         currency_id: int = 3,
-        raw_response: Optional[Dict] = None
+        raw_response: Optional[Dict] = None,
+        timestamp: Optional[str] = None
     ) -> int:
         """Insert Steam price snapshot.
         
+        Args:
+            timestamp: Fetch time (see utc_timestamp), defaults to now
+        
         Returns:
             snapshot_id: ID of inserted snapshot
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        raw_json = json.dumps(raw_response) if raw_response else None
-        
-        cursor.execute("""
-            INSERT INTO steam_snapshots 
-            (item_id, best_bid, best_ask, volume_24h, volume_7d, 
-             median_price, lowest_price, highest_price, currency_id, raw_response)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (item_id, best_bid, best_ask, volume_24h, volume_7d,
-              median_price, lowest_price, highest_price, currency_id, raw_json))
-        
-        snapshot_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return snapshot_id
+        return self._insert_snapshot(
+            self.INSERT_STEAM_SNAPSHOT_SQL, 'steam',
+            (item_id, timestamp, best_bid, best_ask, volume_24h, volume_7d,
+             median_price, lowest_price, highest_price, currency_id),
+            raw_response
+        )
     
     def insert_buff_snapshot(
         self,
@@ -135,32 +351,66 @@ class DatabaseClient:
         sell_order_count: Optional[int] = None,
         buy_order_count: Optional[int] = None,
         currency: str = 'CNY',
-        raw_response: Optional[Dict] = None
+        raw_response: Optional[Dict] = None,
+        timestamp: Optional[str] = None
     ) -> int:
         """Insert Buff price snapshot.
         
+        Args:
+            timestamp: Fetch time (see utc_timestamp), defaults to now
+        
         Returns:
             snapshot_id: ID of inserted snapshot
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        raw_json = json.dumps(raw_response) if raw_response else None
-        
-        cursor.execute("""
-            INSERT INTO buff_snapshots 
-            (item_id, best_ask, best_bid, volume_24h, volume_7d,
-             sell_order_count, buy_order_count, currency, raw_response)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (item_id, best_ask, best_bid, volume_24h, volume_7d,
-              sell_order_count, buy_order_count, currency, raw_json))
-        
-        snapshot_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        return self._insert_snapshot(
+            self.INSERT_BUFF_SNAPSHOT_SQL, 'buff',
+            (item_id, timestamp, best_ask, best_bid, volume_24h, volume_7d,
+             sell_order_count, buy_order_count, currency),
+            raw_response
+        )
+    
+    def _insert_snapshot(self, sql: str, source: str, values: Tuple, raw_response: Optional[Dict]) -> int:
+        """Insert one snapshot row and its raw response in a single transaction."""
+        with self.transaction() as conn:
+            snapshot_id = conn.execute(sql, values).lastrowid
+            if self.store_raw and raw_response:
+                conn.execute(self.INSERT_RAW_RESPONSE_SQL, (
+                    snapshot_id, source, self.raw_codec, self._compress_raw(raw_response)
+                ))
         
         return snapshot_id
     
+    def _compress_raw(self, raw_response: Dict) -> bytes:
+        """Serialize and compress a raw response with the configured codec."""
+        data = _dumps(raw_response)
+        if self._zstd is not None:
+            return self._zstd.compress(data)
+        return zlib.compress(data, 1)
+    
+    def get_raw_response(self, snapshot_id: int, source: str) -> Optional[Dict]:
+        """Get the stored raw API response for a snapshot.
+        
+        Args:
+            snapshot_id: Snapshot ID
+            source: 'steam' or 'buff'
+            
+        Returns:
+            Decoded response, or None if none was stored
+        """
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT codec, body FROM raw_responses WHERE snapshot_id = ? AND source = ?",
+                (snapshot_id, source)
+            ).fetchone()
+        
+        if row is None:
+            return None
+        if row['codec'] == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read zstd-compressed raw responses")
+            return json.loads(zstandard.ZstdDecompressor().decompress(row['body']))
+        return json.loads(zlib.decompress(row['body']))
+    
     def log_fetch(
         self,
         source: str,
@@ -172,17 +422,100 @@ class DatabaseClient:
         item_id: Optional[int] = None
     ):
         """Log API fetch request."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(self.INSERT_FETCH_LOG_SQL, (
+                source, endpoint, None, status_code, latency_ms, success, error_message, item_id
+            ))
+    
+    def _executemany_chunked(self, sql: str, rows: List[Tuple]) -> int:
+        """Insert rows with executemany, one transaction per BULK_CHUNK_SIZE rows."""
+        for start in range(0, len(rows), self.BULK_CHUNK_SIZE):
+            with self.transaction() as conn:
+                conn.executemany(sql, rows[start:start + self.BULK_CHUNK_SIZE])
+        return len(rows)
+    
+    def _insert_snapshots_bulk(self, sql: str, source: str, rows: List[Tuple]) -> int:
+        """Insert snapshot rows (raw_response last) in chunks, plus their raw responses."""
+        for start in range(0, len(rows), self.BULK_CHUNK_SIZE):
+            chunk = rows[start:start + self.BULK_CHUNK_SIZE]
+            with self.transaction() as conn:
+                conn.executemany(sql, [row[:-1] for row in chunk])
+                
+                if self.store_raw:
+                    # AUTOINCREMENT ids handed out in one write transaction
+                    # are consecutive, so they can be derived from the last one
+                    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                    first_id = last_id - len(chunk) + 1
+                    conn.executemany(self.INSERT_RAW_RESPONSE_SQL, [
+                        (first_id + i, source, self.raw_codec, self._compress_raw(row[-1]))
+                        for i, row in enumerate(chunk) if row[-1]
+                    ])
+        return len(rows)
+    
+    def insert_steam_snapshots_bulk(self, rows: List[Tuple]) -> int:
+        """Insert many Steam snapshots with one commit per chunk.
         
-        cursor.execute("""
-            INSERT INTO fetch_logs 
-            (source, endpoint, status_code, latency_ms, success, error_message, item_id)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (source, endpoint, status_code, latency_ms, success, error_message, item_id))
+        Args:
+            rows: List of (item_id, timestamp, best_bid, best_ask, volume_24h,
+                volume_7d, median_price, lowest_price, highest_price,
+                currency_id, raw_response) tuples, timestamp as from
+                utc_timestamp (None for now), raw_response a dict or None
+            
+        Returns:
+            Number of rows inserted
+        """
+        return self._insert_snapshots_bulk(self.INSERT_STEAM_SNAPSHOT_SQL, 'steam', rows)
+    
+    def insert_buff_snapshots_bulk(self, rows: List[Tuple]) -> int:
+        """Insert many Buff snapshots with one commit per chunk.
         
-        conn.commit()
-        conn.close()
+        Args:
+            rows: List of (item_id, timestamp, best_ask, best_bid, volume_24h,
+                volume_7d, sell_order_count, buy_order_count, currency,
+                raw_response) tuples, timestamp as from utc_timestamp (None
+                for now), raw_response a dict or None
+            
+        Returns:
+            Number of rows inserted
+        """
+        return self._insert_snapshots_bulk(self.INSERT_BUFF_SNAPSHOT_SQL, 'buff', rows)
+    
+    def log_fetches_bulk(self, rows: List[Tuple]) -> int:
+        """Log many API fetch requests with one commit per chunk.
+        
+        Args:
+            rows: List of (source, endpoint, timestamp, status_code,
+                latency_ms, success, error_message, item_id) tuples,
+                timestamp as from utc_timestamp (None for now)
+            
+        Returns:
+            Number of rows inserted
+        """
+        return self._executemany_chunked(self.INSERT_FETCH_LOG_SQL, list(rows))
+    
+    def flush_batch(
+        self,
+        steam_rows: List[Tuple],
+        buff_rows: List[Tuple],
+        log_rows: List[Tuple],
+        goods_rows: List[Tuple[str, Optional[int]]] = ()
+    ):
+        """Write a fetch cycle's rows in one transaction.
+        
+        Args:
+            steam_rows: Rows for insert_steam_snapshots_bulk
+            buff_rows: Rows for insert_buff_snapshots_bulk
+            log_rows: Rows for log_fetches_bulk
+            goods_rows: Rows for bulk_upsert_items (resolved Buff goods IDs)
+        """
+        with self.transaction():
+            if goods_rows:
+                self.bulk_upsert_items(goods_rows)
+            self.insert_steam_snapshots_bulk(steam_rows)
+            self.insert_buff_snapshots_bulk(buff_rows)
+            self.log_fetches_bulk(log_rows)
     
     def get_latest_snapshots(self, item_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get latest snapshots for all items or specific item.
@@ -193,29 +526,16 @@ class DatabaseClient:
         Returns:
             List of snapshot dictionaries with joined item data
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Get latest Steam snapshot per item
-        # Probably could do this with a window function but sqlite version might not support it
-        cursor.execute("""
-            SELECT item_id, MAX(timestamp) as max_timestamp
-            FROM steam_snapshots
-            GROUP BY item_id
-        """)
-        steam_latest = {row['item_id']: row['max_timestamp'] for row in cursor.fetchall()}
-        
-        # Get latest Buff snapshot per item
-        cursor.execute("""
-            SELECT item_id, MAX(timestamp) as max_timestamp
-            FROM buff_snapshots
-            GROUP BY item_id
-        """)
-        buff_latest = {row['item_id']: row['max_timestamp'] for row in cursor.fetchall()}
-        
-        # Build query
-        if item_id:
-            cursor.execute("""
+        # One query: the CTEs pick the newest snapshot per item and source
+        where = "WHERE i.item_id = ?" if item_id else ""
+        params = (item_id,) if item_id else ()
+        latest = self.LATEST_WINDOW_CTE if self.WINDOW_FUNCTIONS else self.LATEST_GROUPED_CTE
+        
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = dict_factory
+            cursor.execute(f"""
+                {latest}
                 SELECT 
                     i.item_id,
                     i.market_hash_name,
@@ -226,67 +546,13 @@ class DatabaseClient:
                     b.best_ask as buff_best_ask,
                     b.volume_7d as buff_volume_7d
                 FROM items i
-                LEFT JOIN steam_snapshots s ON i.item_id = s.item_id 
-                    AND s.timestamp = ?
-                LEFT JOIN buff_snapshots b ON i.item_id = b.item_id 
-                    AND b.timestamp = ?
-                WHERE i.item_id = ?
-            """, (steam_latest.get(item_id), buff_latest.get(item_id), item_id))
-        else:
-            # For all items, we need to join with latest timestamps
-            # Use a simpler approach: get items and latest snapshots separately
-            cursor.execute("SELECT item_id, market_hash_name FROM items")
-            items = cursor.fetchall()
-            
-            results = []
-            for item_row in items:
-                item_id = item_row['item_id']
-                steam_ts = steam_latest.get(item_id)
-                buff_ts = buff_latest.get(item_id)
-                
-                # Get latest Steam snapshot
-                steam_data = None
-                if steam_ts:
-                    cursor.execute("""
-                        SELECT timestamp, best_bid, volume_7d
-                        FROM steam_snapshots
-                        WHERE item_id = ? AND timestamp = ?
-                    """, (item_id, steam_ts))
-                    steam_row = cursor.fetchone()
-                    if steam_row:
-                        steam_data = dict(steam_row)
-                
-                # Get latest Buff snapshot
-                buff_data = None
-                if buff_ts:
-                    cursor.execute("""
-                        SELECT timestamp, best_ask, volume_7d
-                        FROM buff_snapshots
-                        WHERE item_id = ? AND timestamp = ?
-                    """, (item_id, buff_ts))
-                    buff_row = cursor.fetchone()
-                    if buff_row:
-                        buff_data = dict(buff_row)
-                
-                result = {
-                    'item_id': item_id,
-                    'market_hash_name': item_row['market_hash_name'],
-                    'steam_timestamp': steam_data['timestamp'] if steam_data else None,
-                    'steam_best_bid': steam_data['best_bid'] if steam_data else None,
-                    'steam_volume_7d': steam_data['volume_7d'] if steam_data else None,
-                    'buff_timestamp': buff_data['timestamp'] if buff_data else None,
-                    'buff_best_ask': buff_data['best_ask'] if buff_data else None,
-                    'buff_volume_7d': buff_data['volume_7d'] if buff_data else None,
-                }
-                results.append(result)
+                LEFT JOIN s ON s.item_id = i.item_id AND s.r = 1
+                LEFT JOIN b ON b.item_id = i.item_id AND b.r = 1
+                {where}
+                ORDER BY i.item_id
+            """, params)
             
-            conn.close()
-            return results
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return [dict(row) for row in rows]
+            return cursor.fetchall()
     
     def get_price_history(self, item_id: int, days: int = 7) -> Dict[str, List]:
         """Get price history for an item.
@@ -298,32 +564,35 @@ class DatabaseClient:
         Returns:
             Dictionary with 'steam' and 'buff' price lists
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Get Steam history
-        cursor.execute("""
-            SELECT timestamp, best_bid, median_price
-            FROM steam_snapshots
-            WHERE item_id = ? 
-            AND timestamp >= datetime('now', '-' || ? || ' days')
-            ORDER BY timestamp ASC
-        """, (item_id, days))
-        
-        steam_data = [dict(row) for row in cursor.fetchall()]
-        
-        # Get Buff history
-        cursor.execute("""
-            SELECT timestamp, best_ask
-            FROM buff_snapshots
-            WHERE item_id = ? 
-            AND timestamp >= datetime('now', '-' || ? || ' days')
-            ORDER BY timestamp ASC
-        """, (item_id, days))
-        
-        buff_data = [dict(row) for row in cursor.fetchall()]
+        # Same format as CURRENT_TIMESTAMP, so the comparison is a plain
+        # index range scan with a constant statement text
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
         
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = dict_factory
+            
+            # Get Steam history
+            cursor.execute("""
+                SELECT timestamp, best_bid, median_price
+                FROM steam_snapshots
+                WHERE item_id = ? 
+                AND timestamp >= ?
+                ORDER BY timestamp ASC
+            """, (item_id, cutoff))
+            
+            steam_data = cursor.fetchall()
+            
+            # Get Buff history
+            cursor.execute("""
+                SELECT timestamp, best_ask
+                FROM buff_snapshots
+                WHERE item_id = ? 
+                AND timestamp >= ?
+                ORDER BY timestamp ASC
+            """, (item_id, cutoff))
+            
+            buff_data = cursor.fetchall()
         
         return {
             'steam': steam_data,
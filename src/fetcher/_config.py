@@ -0,0 +1,53 @@
+"""Cached YAML/TOML config loading shared by the fetchers and the puller."""
+
+import functools
+import logging
+from pathlib import Path
+from typing import Dict
+
+import yaml
+
+try:
+    import tomllib  # Python 3.11+
+except ImportError:  # pragma: no cover - depends on environment
+    tomllib = None
+
+logger = logging.getLogger(__name__)
+
+# libyaml's C loader is ~10x faster than the pure Python one
+_Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(config_path: str, mtime_ns: int) -> Dict:
+    """Parse a config file once per (path, mtime_ns)."""
+    if config_path.endswith('.toml'):
+        if tomllib is None:
+            raise RuntimeError("TOML config requires Python 3.11+ (tomllib)")
+        with open(config_path, 'rb') as f:
+            return tomllib.load(f)
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=_Loader) or {}
+
+
+def load_config(config_path: str) -> Dict:
+    """Load configuration file, reparsing only when it changes on disk.
+    
+    Paths ending in .toml are read with the stdlib tomllib, which is faster
+    than PyYAML; anything else is parsed as YAML. The returned dict is
+    shared between callers and must not be mutated.
+    
+    Args:
+        config_path: Path to YAML or TOML config file
+    
+    Returns:
+        Parsed config, or an empty dict if the file doesn't exist
+    """
+    try:
+        # Integer nanoseconds, so two edits within a float's resolution
+        # still count as a change
+        mtime_ns = Path(config_path).stat().st_mtime_ns
+        return _load_config_cached(config_path, mtime_ns)
+    except FileNotFoundError:
+        logger.warning("Config file %s not found, using defaults", config_path)
+        return {}
@@ -0,0 +1,179 @@
+"""Pooled requests session and GET helper shared by the sync fetchers."""
+
+import json
+import logging
+import time
+from itertools import takewhile
+from typing import Optional, Dict, Any, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from orjson import loads as _loads  # C parser, 2-3x faster than json.loads
+except ImportError:  # pragma: no cover - depends on environment
+    _loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limited or transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Conditional request answered with "not modified" (no body)
+NOT_MODIFIED = 304
+
+
+def etag_key(url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    """Key for the ETag remembered for a URL and its query parameters."""
+    return (url, tuple(params.items())) if params else url
+
+
+class _PacedRetry(Retry):
+    """urllib3 retry policy with the async fetchers' backoff and rate limiting.
+    
+    Waits backoff_base ** n seconds before retry n + 1 unless the server
+    sent Retry-After, and takes a token from the fetcher's bucket for each
+    retry, so retries count against the rate limit like first attempts.
+    """
+    
+    def __init__(self, *args, backoff_base: float = 2.0, bucket=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.backoff_base = backoff_base
+        self.bucket = bucket
+    
+    def new(self, **kw) -> '_PacedRetry':
+        retry = super().new(**kw)
+        retry.backoff_base = self.backoff_base
+        retry.bucket = self.bucket
+        return retry
+    
+    def get_backoff_time(self) -> float:
+        # Consecutive errors since the last redirect, as in urllib3
+        errors = len(list(takewhile(lambda r: r.redirect_location is None, reversed(self.history))))
+        if errors == 0:
+            return 0.0
+        # backoff_max is urllib3 2.x only; 1.26 caps at the class default
+        backoff_max = getattr(self, 'backoff_max', Retry.DEFAULT_BACKOFF_MAX)
+        return float(min(backoff_max, self.backoff_base ** (errors - 1)))
+    
+    def increment(self, *args, **kwargs) -> '_PacedRetry':
+        # Raises once retries are exhausted, before a token is spent
+        retry = super().increment(*args, **kwargs)
+        if self.bucket is not None:
+            self.bucket.acquire()
+        return retry
+
+
+def make_session(
+    headers: Dict[str, str],
+    max_retries: int = 3,
+    pool_size: int = 10,
+    backoff_base: float = 2.0,
+    bucket=None
+) -> requests.Session:
+    """Create a keep-alive session that retries transient failures.
+    
+    Retries (with exponential backoff, honouring Retry-After) happen inside
+    urllib3, so callers make a single get() call per request.
+    
+    Args:
+        headers: Default headers sent with every request
+        max_retries: Total attempts per request, including the first
+        pool_size: Pooled connections kept per host
+        backoff_base: Retry n waits backoff_base ** (n - 1) seconds
+        bucket: TokenBucket each retry takes a token from (None to retry
+            without rate limiting)
+    
+    Returns:
+        Configured requests.Session
+    """
+    retry = _PacedRetry(
+        total=max(max_retries - 1, 0),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False,
+        backoff_base=backoff_base,
+        bucket=bucket
+    )
+    
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class _SyncHTTPMixin:
+    """GET-and-decode helper for fetchers holding a session and a token bucket.
+    
+    Fetchers also hold `_etags`, the last ETag seen per conditional URL.
+    """
+    
+    @property
+    def etags(self) -> Dict[Any, str]:
+        """Last ETag per URL; pass to an async fetcher's etags argument to share it."""
+        return self._etags
+    
+    def _rate_limit(self):
+        """Enforce rate limiting."""
+        self.bucket.acquire()
+    
+    def _get_json(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        context: str = '',
+        conditional: bool = False
+    ) -> Tuple[Optional[int], Optional[Any], Optional[int], Optional[str]]:
+        """GET a JSON endpoint (retries are handled by the session).
+        
+        Args:
+            url: Endpoint URL
+            params: Query parameters
+            context: Description used in log messages
+            conditional: Send If-None-Match with the last ETag for this URL
+        
+        Returns:
+            Tuple of (status_code, data, latency_ms, error). data is None
+            unless a 200 response was received; a 304 (NOT_MODIFIED) status
+            means the body is unchanged since the last request.
+        """
+        # Rate limiting
+        self._rate_limit()
+        
+        key = etag_key(url, params) if conditional else None
+        etag = self._etags.get(key) if conditional else None
+        headers = {'If-None-Match': etag} if etag else None
+        
+        try:
+            start_time = time.monotonic()
+            response = self._session.get(url, params=params, headers=headers, timeout=10)
+            latency_ms = int((time.monotonic() - start_time) * 1000)
+        except requests.exceptions.RequestException as e:
+            logger.error("Error during %s: %s", context, e)
+            return None, None, None, str(e)
+        
+        if response.status_code == NOT_MODIFIED:
+            return NOT_MODIFIED, None, latency_ms, None
+        
+        if response.status_code != 200:
+            logger.warning("%s returned status %s", context, response.status_code)
+            return response.status_code, None, latency_ms, f"HTTP {response.status_code}"
+        
+        new_etag = response.headers.get('ETag') if conditional else None
+        if new_etag:
+            self._etags[key] = new_etag
+        
+        return response.status_code, _loads(response.content), latency_ms, None
+    
+    @staticmethod
+    def _unchanged_result(latency_ms: Optional[int]) -> Dict[str, Any]:
+        """Result for a 304 response: the previous data still holds."""
+        return {
+            'success': True,
+            'unchanged': True,
+            'status_code': NOT_MODIFIED,
+            'latency_ms': latency_ms
+        }
@@ -0,0 +1,64 @@
+"""Token bucket rate limiting shared by the fetchers."""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter.
+    
+    Holds up to `capacity` tokens, refilled continuously at `rate` tokens per
+    second. Each request takes one token, so bursts up to `capacity` go out
+    immediately while sustained throughput stays capped at `rate`.
+    
+    Tokens are reserved up front: a caller that finds the bucket empty takes
+    a token on credit and sleeps until it would have been refilled, so
+    concurrent callers queue fairly without polling.
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        """Initialize token bucket.
+        
+        Args:
+            rate: Refill rate in tokens per second
+            capacity: Maximum burst size in tokens
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def per_minute(cls, requests_per_minute: float):
+        """Bucket allowing a burst of one minute's budget, refilled steadily."""
+        return cls(rate=requests_per_minute / 60.0, capacity=requests_per_minute)
+    
+    def _reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens and return how long the caller must wait for them."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+            self.last_refill = now
+            
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+    
+    def acquire(self, tokens: float = 1.0):
+        """Block until `tokens` are available."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class AsyncTokenBucket(TokenBucket):
+    """Token bucket whose acquire() awaits instead of blocking the event loop."""
+    
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until `tokens` are available."""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
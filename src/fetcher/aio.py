@@ -0,0 +1,374 @@
+"""Async (aiohttp) variants of the Steam and Buff fetchers.
+
+These reuse config, headers and response parsing from the sync fetchers, so
+results have the same shape. Independent requests can be issued together with
+asyncio.gather and overlap their network round trips.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional, Dict, Any, Tuple
+
+import aiohttp
+
+from src.fetcher._http import NOT_MODIFIED, RETRY_STATUSES, _loads, etag_key
+from src.fetcher._ratelimit import AsyncTokenBucket
+from src.fetcher.cache import ttl_cached
+from src.fetcher.steam import SteamFetcher
+from src.fetcher.buff import BuffFetcher
+
+logger = logging.getLogger(__name__)
+
+
+def _header_float(headers, name: str) -> Optional[float]:
+    """Read a numeric header, returning None if missing or malformed."""
+    if not headers or name not in headers:
+        return None
+    try:
+        return float(headers[name])
+    except (TypeError, ValueError):
+        return None
+
+
+def make_client_session(limit: int = 32, limit_per_host: int = 8) -> aiohttp.ClientSession:
+    """Create an aiohttp session meant to be kept for the life of the process.
+    
+    DNS lookups are cached for 5 minutes and idle connections kept alive
+    for a minute, so a session reused across cycles skips both the lookup
+    and the TCP/TLS handshake. Must be called with an event loop running.
+    
+    Args:
+        limit: Total connections open at once
+        limit_per_host: Connections open at once to any one host
+    
+    Returns:
+        New aiohttp.ClientSession; close() it on shutdown
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=300,
+        keepalive_timeout=60
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+class AdaptiveLimiter:
+    """Concurrency limiter with AIMD adjustment and header-based pacing.
+    
+    Works like an asyncio.Semaphore whose size grows by one after each
+    successful response and halves on HTTP 429 (additive increase,
+    multiplicative decrease). When a response reports less than 10% of its
+    budget left via X-RateLimit-Remaining / X-RateLimit-Limit, new requests
+    are held back for Retry-After seconds (or min_pause if not given).
+    """
+    
+    def __init__(self, max_concurrency: int = 10, min_pause: float = 1.0):
+        """Initialize limiter.
+        
+        Args:
+            max_concurrency: Upper bound on requests in flight
+            min_pause: Pause in seconds when throttled without a Retry-After
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.min_pause = min_pause
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._cond = asyncio.Condition()
+    
+    async def __aenter__(self):
+        # Pause before taking a slot: a task cancelled while paused never
+        # reaches __aexit__, so a slot taken first would never be released
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            logger.debug("Rate limit budget low, pausing %.2fs", pause)
+            await asyncio.sleep(pause)
+        
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+    
+    def _pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+    
+    def record(self, status: Optional[int], headers=None):
+        """Adjust the limit based on a response.
+        
+        Args:
+            status: HTTP status code (None for connection errors)
+            headers: Response headers
+        """
+        retry_after = _header_float(headers, 'Retry-After')
+        
+        if status == 429:
+            self.limit = max(1, self.limit // 2)
+            self._pause(retry_after or self.min_pause)
+        elif status is not None and status < 400:
+            self.limit = min(self.max_concurrency, self.limit + 1)
+        
+        # Reactive pacing from rate limit headers, when the server sends them
+        remaining = _header_float(headers, 'X-RateLimit-Remaining')
+        budget = _header_float(headers, 'X-RateLimit-Limit')
+        if remaining is not None and budget and remaining < 0.1 * budget:
+            self._pause(retry_after or self.min_pause)
+
+
+class _AsyncHTTPMixin:
+    """Shared aiohttp session handling and retry loop for async fetchers."""
+    
+    def _init_async(
+        self,
+        session: Optional[aiohttp.ClientSession],
+        limiter: Optional[AdaptiveLimiter],
+        etags: Optional[Dict[Any, str]]
+    ):
+        if etags is not None:
+            self._etags = etags
+        self.session = session
+        self._owns_session = session is None
+        self.limiter = limiter or AdaptiveLimiter(max_concurrency=min(self.rate_limit, 10))
+        self.bucket = AsyncTokenBucket.per_minute(self.rate_limit)
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None:
+            self.session = make_client_session(limit=10)
+        return self.session
+    
+    async def close(self):
+        """Close the HTTP session if this fetcher created it."""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+        # Also release the sync fetcher's requests session
+        super().close()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def _get_json(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        context: str = '',
+        conditional: bool = False
+    ) -> Tuple[Optional[int], Optional[Any], Optional[int], Optional[str]]:
+        """GET a JSON endpoint with retries and exponential backoff.
+        
+        Like the sync session, only RETRY_STATUSES (429 / 5xx) and connection
+        errors are retried.
+        
+        Args:
+            url: Endpoint URL
+            params: Query parameters
+            context: Description used in log messages
+            conditional: Send If-None-Match with the last ETag for this URL
+        
+        Returns:
+            Tuple of (status_code, data, latency_ms, error). data is None
+            unless a 200 response was received; a 304 (NOT_MODIFIED) status
+            means the body is unchanged since the last request.
+        """
+        session = await self._get_session()
+        status, latency_ms, error = None, None, None
+        
+        key = etag_key(url, params) if conditional else None
+        etag = self._etags.get(key) if conditional else None
+        headers = {**self.headers, 'If-None-Match': etag} if etag else self.headers
+        
+        for attempt in range(self.max_retries):
+            # Rate limiting, retries included: each attempt is a request
+            await self.bucket.acquire()
+            try:
+                async with self.limiter:
+                    start_time = time.monotonic()
+                    async with session.get(
+                        url, headers=headers, params=params,
+                        timeout=aiohttp.ClientTimeout(total=10)
+                    ) as response:
+                        latency_ms = int((time.monotonic() - start_time) * 1000)
+                        status = response.status
+                        self.limiter.record(status, response.headers)
+                        
+                        if status == NOT_MODIFIED:
+                            return status, None, latency_ms, None
+                        if status == 200:
+                            new_etag = response.headers.get('ETag') if conditional else None
+                            if new_etag:
+                                self._etags[key] = new_etag
+                            data = _loads(await response.read())
+                            return status, data, latency_ms, None
+                
+                logger.warning("%s returned status %s", context, status)
+                error = f"HTTP {status}"
+                if status not in RETRY_STATUSES:
+                    # Same policy as the sync session: other 4xx won't change
+                    break
+            
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error("Error during %s: %s", context, e)
+                self.limiter.record(None)
+                status, latency_ms, error = None, None, str(e)
+            
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(self.backoff_base ** attempt)
+        
+        return status, None, latency_ms, error
+
+
+class AsyncSteamFetcher(_AsyncHTTPMixin, SteamFetcher):
+    """Async version of SteamFetcher."""
+    
+    def __init__(
+        self,
+        config_path: str = "config.yaml",
+        session: Optional[aiohttp.ClientSession] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        etags: Optional[Dict[Any, str]] = None
+    ):
+        """Initialize async Steam fetcher.
+        
+        Args:
+            config_path: Path to config file
+            session: Shared aiohttp session (created on first use if None)
+            limiter: Concurrency limiter (one per fetcher if None)
+            etags: ETag store to share with another fetcher, e.g. one that
+                outlives this fetcher (a new store if None)
+        """
+        super().__init__(config_path)
+        self._init_async(session, limiter, etags)
+    
+    @ttl_cached
+    async def fetch_price_overview(
+        self,
+        market_hash_name: str,
+        app_id: int = 730,
+        currency_id: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch price overview for an item (see SteamFetcher.fetch_price_overview)."""
+        url = self._price_overview_url(market_hash_name, app_id, currency_id)
+        status, data, latency_ms, error = await self._get_json(
+            url, context=f"Steam priceoverview for {market_hash_name}", conditional=True
+        )
+        
+        if status == NOT_MODIFIED:
+            return self._unchanged_result(latency_ms)
+        if data is None:
+            return {
+                'success': False,
+                'error': error,
+                'status_code': status,
+                'latency_ms': latency_ms
+            }
+        return self._parse_price_overview(data, status, latency_ms)
+
+
+class AsyncBuffFetcher(_AsyncHTTPMixin, BuffFetcher):
+    """Async version of BuffFetcher."""
+    
+    def __init__(
+        self,
+        config_path: str = "config.yaml",
+        session: Optional[aiohttp.ClientSession] = None,
+        limiter: Optional[AdaptiveLimiter] = None,
+        etags: Optional[Dict[Any, str]] = None
+    ):
+        """Initialize async Buff fetcher.
+        
+        Args:
+            config_path: Path to config file
+            session: Shared aiohttp session (created on first use if None)
+            limiter: Concurrency limiter (one per fetcher if None)
+            etags: ETag store to share with another fetcher, e.g. one that
+                outlives this fetcher (a new store if None)
+        """
+        super().__init__(config_path)
+        self._init_async(session, limiter, etags)
+    
+    @ttl_cached
+    async def search_goods(self, search_term: str, game: str = 'csgo') -> Optional[Dict[str, Any]]:
+        """Search for goods by name (see BuffFetcher.search_goods)."""
+        params = {
+            'game': game,
+            'search': search_term,
+            'page_num': 1,
+            'sort_by': 'sell_num.desc'
+        }
+        status, data, latency_ms, error = await self._get_json(
+            self.SEARCH_URL, params, context=f"Buff search for {search_term}"
+        )
+        
+        if data is None:
+            return {
+                'success': False,
+                'error': error,
+                'status_code': status,
+                'latency_ms': latency_ms
+            }
+        return {
+            'success': True,
+            'data': data,
+            'status_code': status,
+            'latency_ms': latency_ms
+        }
+    
+    @ttl_cached
+    async def get_sell_orders(self, goods_id: int, game: str = 'csgo', page_num: int = 1) -> Optional[Dict[str, Any]]:
+        """Get sell orders (asks) for a goods ID (see BuffFetcher.get_sell_orders)."""
+        params = {
+            'game': game,
+            'goods_id': goods_id,
+            'page_num': page_num,
+            'sort_by': 'default'
+        }
+        status, data, latency_ms, _ = await self._get_json(
+            self.SELL_ORDER_URL, params, context=f"Buff sell orders for goods_id {goods_id}",
+            conditional=True
+        )
+        
+        if status == NOT_MODIFIED:
+            return self._unchanged_result(latency_ms)
+        if data is None:
+            return None
+        return self._parse_orders(data, 'best_ask', status, latency_ms)
+    
+    @ttl_cached
+    async def get_buy_orders(self, goods_id: int, game: str = 'csgo', page_num: int = 1) -> Optional[Dict[str, Any]]:
+        """Get buy orders (bids) for a goods ID (see BuffFetcher.get_buy_orders)."""
+        params = {
+            'game': game,
+            'goods_id': goods_id,
+            'page_num': page_num
+        }
+        status, data, latency_ms, _ = await self._get_json(
+            self.BUY_ORDER_URL, params, context=f"Buff buy orders for goods_id {goods_id}",
+            conditional=True
+        )
+        
+        if status == NOT_MODIFIED:
+            return self._unchanged_result(latency_ms)
+        if data is None:
+            return None
+        return self._parse_orders(data, 'best_bid', status, latency_ms)
+    
+    async def get_orders_both(
+        self,
+        goods_id: int,
+        game: str = 'csgo'
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Get sell and buy orders for a goods ID concurrently (see BuffFetcher.get_orders_both)."""
+        sell_result, buy_result = await asyncio.gather(
+            self.get_sell_orders(goods_id, game),
+            self.get_buy_orders(goods_id, game)
+        )
+        return sell_result, buy_result
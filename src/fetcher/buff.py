@@ -1,13 +1,15 @@
 """Buff marketplace data fetcher."""
 
-import requests
-import time
 import logging
 import os
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Tuple
 from dotenv import load_dotenv
-import yaml
 from pathlib import Path
+from src.fetcher._config import load_config
+from src.fetcher._http import NOT_MODIFIED, _SyncHTTPMixin, make_session
+from src.fetcher._ratelimit import TokenBucket
+from src.fetcher.cache import TTLCache, ttl_cached
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +17,13 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 
-class BuffFetcher:
+class BuffFetcher(_SyncHTTPMixin):
     """Fetches price data from Buff marketplace."""
     
+    SEARCH_URL = "https://buff.163.com/api/market/goods"
+    SELL_ORDER_URL = "https://buff.163.com/api/market/goods/sell_order"
+    BUY_ORDER_URL = "https://buff.163.com/api/market/goods/buy_order"
+    
     def __init__(self, config_path: str = "config.yaml"):
         """Initialize Buff fetcher.
         
@@ -29,9 +35,15 @@ class BuffFetcher:
         self.backoff_base = self.config.get('rate_limits', {}).get('buff', {}).get('backoff_base', 2.0)
         self.max_retries = self.config.get('rate_limits', {}).get('buff', {}).get('max_retries', 3)
         
-        self.last_request_time = 0
-        self.request_count = 0
-        self.request_window_start = time.time()
+        # Bursts up to one minute's budget, then refills steadily
+        self.bucket = TokenBucket.per_minute(self.rate_limit)
+        
+        # Recent successful responses, reused within the TTL
+        cache_config = self.config.get('cache', {})
+        self.response_cache = TTLCache(
+            maxsize=cache_config.get('maxsize', 1024),
+            ttl=cache_config.get('ttl_seconds', 60)
+        )
         
         # Get cookie from environment variable
         # TODO: should probably handle cookie expiration better
@@ -50,91 +62,83 @@ class BuffFetcher:
         
         if self.cookie:
             self.headers['Cookie'] = self.cookie
-    
-    def _load_config(self, config_path: str) -> Dict:
-        """Load configuration file."""
-        try:
-            with open(config_path, 'r') as f:
-                return yaml.safe_load(f)
-        except FileNotFoundError:
-            logger.warning(f"Config file {config_path} not found, using defaults")
-            return {}
-    
-    def _rate_limit(self):
-        """Enforce rate limiting."""
-        current_time = time.time()
         
-        # Reset counter if window expired
-        if current_time - self.request_window_start >= 60:
-            self.request_count = 0
-            self.request_window_start = current_time
+        # Persistent session so requests reuse TCP/TLS connections. Each
+        # puller worker can have its sell and buy order requests in flight
+        # at once, so keep two pooled connections per worker.
+        max_workers = self.config.get('puller', {}).get('max_workers', 8)
+        self._session = make_session(
+            self.headers, self.max_retries, pool_size=2 * max_workers,
+            backoff_base=self.backoff_base, bucket=self.bucket
+        )
         
-        # Check if we need to wait
-        if self.request_count >= self.rate_limit:
-            sleep_time = 60 - (current_time - self.request_window_start)
-            if sleep_time > 0:
-                logger.debug(f"Rate limit reached, sleeping {sleep_time:.2f}s")
-                time.sleep(sleep_time)
-                self.request_count = 0
-                self.request_window_start = time.time()
+        # Last ETag per URL, sent back as If-None-Match on order/price requests
+        self._etags: Dict[Any, str] = {}
+    
+    def close(self):
+        """Close the HTTP session and its pooled connections."""
+        self._session.close()
+    
+    def reset_cycle_cache(self, cycle_seconds: float = 0):
+        """Start a fetch cycle with an empty response cache.
         
-        # Enforce minimum time between requests
-        time_since_last = current_time - self.last_request_time
-        min_interval = 60.0 / self.rate_limit
-        if time_since_last < min_interval:
-            time.sleep(min_interval - time_since_last)
+        Orders cached in one cycle are never reused by the next, however
+        short the interval (see SteamFetcher.reset_cycle_cache).
         
-        self.last_request_time = time.time()
-        self.request_count += 1
+        Args:
+            cycle_seconds: Expected length of the cycle
+        """
+        configured_ttl = self.config.get('cache', {}).get('ttl_seconds', 60)
+        self.response_cache.ttl = max(configured_ttl, cycle_seconds)
+        self.response_cache.clear()
+    
+    def __enter__(self):
+        return self
     
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _load_config(self, config_path: str) -> Dict:
+        """Load configuration file."""
+        return load_config(config_path)
+    
+    @ttl_cached
     def search_goods(self, search_term: str, game: str = 'csgo') -> Optional[Dict[str, Any]]:
         """Search for goods by name.
         
         Args:
             search_term: Item name to search for
             game: Game identifier ('csgo' for CS2)
-            
+        
         Returns:
-            Dictionary with search results or None on error
+            Dictionary with search results; on error, success is False and
+            status_code is the HTTP status (None if no response was received)
         """
-        url = "https://buff.163.com/api/market/goods"
         params = {
             'game': game,
             'search': search_term,
             'page_num': 1,
             'sort_by': 'sell_num.desc'
         }
+        status, data, latency_ms, error = self._get_json(
+            self.SEARCH_URL, params, context=f"Buff search for {search_term}"
+        )
         
-        self._rate_limit()
-        
-        for attempt in range(self.max_retries):
-            try:
-                start_time = time.time()
-                response = requests.get(url, headers=self.headers, params=params, timeout=10)
-                latency_ms = int((time.time() - start_time) * 1000)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    return {
-                        'success': True,
-                        'data': data,
-                        'status_code': response.status_code,
-                        'latency_ms': latency_ms
-                    }
-                else:
-                    logger.warning(f"Buff search API returned status {response.status_code}")
-                    if attempt < self.max_retries - 1:
-                        sleep_time = self.backoff_base ** attempt
-                        time.sleep(sleep_time)
-            
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error searching Buff for {search_term}: {e}")
-                if attempt < self.max_retries - 1:
-                    sleep_time = self.backoff_base ** attempt
-                    time.sleep(sleep_time)
-        
-        return None
+        if data is None:
+            return {
+                'success': False,
+                'error': error,
+                'status_code': status,
+                'latency_ms': latency_ms
+            }
+        return {
+            'success': True,
+            'data': data,
+            'status_code': status,
+            'latency_ms': latency_ms
+        }
     
+    @ttl_cached
     def get_sell_orders(self, goods_id: int, game: str = 'csgo', page_num: int = 1) -> Optional[Dict[str, Any]]:
         """Get sell orders (asks) for a goods ID.
         
@@ -142,61 +146,28 @@ class BuffFetcher:
             goods_id: Buff goods ID
             game: Game identifier ('csgo' for CS2)
             page_num: Page number
-            
+        
         Returns:
             Dictionary with sell order data or None on error
         """
-        url = "https://buff.163.com/api/market/goods/sell_order"
         params = {
             'game': game,
             'goods_id': goods_id,
             'page_num': page_num,
             'sort_by': 'default'
         }
+        status, data, latency_ms, _ = self._get_json(
+            self.SELL_ORDER_URL, params, context=f"Buff sell orders for goods_id {goods_id}",
+            conditional=True
+        )
         
-        self._rate_limit()
-        
-        for attempt in range(self.max_retries):
-            try:
-                start_time = time.time()
-                response = requests.get(url, headers=self.headers, params=params, timeout=10)
-                latency_ms = int((time.time() - start_time) * 1000)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Parse sell orders
-                    orders = data.get('data', {}).get('items', [])
-                    if orders:
-                        best_ask = float(orders[0].get('price', 0))
-                        order_count = len(orders)
-                    else:
-                        best_ask = None
-                        order_count = 0
-                    
-                    return {
-                        'success': True,
-                        'best_ask': best_ask,
-                        'order_count': order_count,
-                        'orders': orders,
-                        'raw_response': data,
-                        'status_code': response.status_code,
-                        'latency_ms': latency_ms
-                    }
-                else:
-                    logger.warning(f"Buff sell orders API returned status {response.status_code} for goods_id {goods_id}")
-                    if attempt < self.max_retries - 1:
-                        sleep_time = self.backoff_base ** attempt
-                        time.sleep(sleep_time)
-            
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error fetching Buff sell orders for goods_id {goods_id}: {e}")
-                if attempt < self.max_retries - 1:
-                    sleep_time = self.backoff_base ** attempt
-                    time.sleep(sleep_time)
-        
-        return None
+        if status == NOT_MODIFIED:
+            return self._unchanged_result(latency_ms)
+        if data is None:
+            return None
+        return self._parse_orders(data, 'best_ask', status, latency_ms)
     
+    @ttl_cached
     def get_buy_orders(self, goods_id: int, game: str = 'csgo', page_num: int = 1) -> Optional[Dict[str, Any]]:
         """Get buy orders (bids) for a goods ID.
         
@@ -204,60 +175,74 @@ class BuffFetcher:
             goods_id: Buff goods ID
             game: Game identifier ('csgo' for CS2)
             page_num: Page number
-            
+        
         Returns:
             Dictionary with buy order data or None on error
         """
-        url = "https://buff.163.com/api/market/goods/buy_order"
         params = {
             'game': game,
             'goods_id': goods_id,
             'page_num': page_num
         }
+        status, data, latency_ms, _ = self._get_json(
+            self.BUY_ORDER_URL, params, context=f"Buff buy orders for goods_id {goods_id}",
+            conditional=True
+        )
         
-        self._rate_limit()
+        if status == NOT_MODIFIED:
+            return self._unchanged_result(latency_ms)
+        if data is None:
+            return None
+        return self._parse_orders(data, 'best_bid', status, latency_ms)
+    
+    def get_orders_both(
+        self,
+        goods_id: int,
+        game: str = 'csgo'
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Get sell and buy orders for a goods ID with overlapping requests.
         
-        for attempt in range(self.max_retries):
-            try:
-                start_time = time.time()
-                response = requests.get(url, headers=self.headers, params=params, timeout=10)
-                latency_ms = int((time.time() - start_time) * 1000)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Parse buy orders
-                    orders = data.get('data', {}).get('items', [])
-                    if orders:
-                        best_bid = float(orders[0].get('price', 0))
-                        order_count = len(orders)
-                    else:
-                        best_bid = None
-                        order_count = 0
-                    
-                    return {
-                        'success': True,
-                        'best_bid': best_bid,
-                        'order_count': order_count,
-                        'orders': orders,
-                        'raw_response': data,
-                        'status_code': response.status_code,
-                        'latency_ms': latency_ms
-                    }
-                else:
-                    logger.warning(f"Buff buy orders API returned status {response.status_code} for goods_id {goods_id}")
-                    if attempt < self.max_retries - 1:
-                        sleep_time = self.backoff_base ** attempt
-                        time.sleep(sleep_time)
-            
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error fetching Buff buy orders for goods_id {goods_id}: {e}")
-                if attempt < self.max_retries - 1:
-                    sleep_time = self.backoff_base ** attempt
-                    time.sleep(sleep_time)
+        The two endpoints are independent, so they are fetched on two threads.
+        Each request still takes its own rate limit token.
         
-        return None
-
+        Args:
+            goods_id: Buff goods ID
+            game: Game identifier
+        
+        Returns:
+            Tuple of (sell orders result, buy orders result)
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            sell_future = executor.submit(self.get_sell_orders, goods_id, game)
+            buy_future = executor.submit(self.get_buy_orders, goods_id, game)
+            return sell_future.result(), buy_future.result()
+    
+    def _parse_orders(self, data: Dict, price_key: str, status_code: int, latency_ms: int) -> Dict[str, Any]:
+        """Parse a sell/buy order response into a result dictionary.
+        
+        Args:
+            data: Decoded JSON response
+            price_key: 'best_ask' for sell orders, 'best_bid' for buy orders
+            status_code: HTTP status code
+            latency_ms: Request latency in milliseconds
+        """
+        orders = data.get('data', {}).get('items', [])
+        if orders:
+            best_price = float(orders[0].get('price', 0))
+            order_count = len(orders)
+        else:
+            best_price = None
+            order_count = 0
+        
+        return {
+            'success': True,
+            price_key: best_price,
+            'order_count': order_count,
+            'orders': orders,
+            'raw_response': data,
+            'status_code': status_code,
+            'latency_ms': latency_ms
+        }
 
 if __name__ == "__main__":
     # Test fetcher
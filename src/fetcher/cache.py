@@ -0,0 +1,217 @@
+"""TTL caches for fetcher responses (in-memory, or persisted to disk)."""
+
+import functools
+import inspect
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after `ttl` seconds."""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        """Initialize cache.
+        
+        Args:
+            maxsize: Maximum number of entries (least recently used evicted first)
+            ttl: Entry lifetime in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any):
+        """Store value under key."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value (expired or not)."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[1]
+    
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskTTLCache:
+    """TTLCache-compatible cache persisted in a small SQLite file.
+    
+    Entries survive restarts, so a fetcher started again within the TTL
+    skips the network entirely. Expiry uses wall-clock time since entries
+    outlive the process. Values are pickled.
+    """
+    
+    def __init__(self, path: str, maxsize: int = 10000, ttl: float = 600.0, namespace: str = ''):
+        """Initialize cache.
+        
+        Args:
+            path: SQLite file to store entries in (parent dirs are created)
+            maxsize: Maximum number of entries (soonest to expire evicted first)
+            ttl: Entry lifetime in seconds
+            namespace: Prefix for keys, for settings that change the response
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL,
+                value BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache(expires_at);
+        """)
+    
+    def _key(self, key: Hashable) -> str:
+        return f"{self.namespace}:{key!r}"
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?",
+                (self._key(key), time.time())
+            ).fetchone()
+        return default if row is None else pickle.loads(row[0])
+    
+    def set(self, key: Hashable, value: Any):
+        """Store value under key, dropping expired and overflow entries."""
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)",
+                (self._key(key), now + self.ttl, blob)
+            )
+            self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            overflow = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.maxsize
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY expires_at LIMIT ?)", (overflow,)
+                )
+    
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value (expired or not)."""
+        with self._lock:
+            row = self._conn.execute(
+                "DELETE FROM cache WHERE key = ? RETURNING value", (self._key(key),)
+            ).fetchone()
+        return default if row is None else pickle.loads(row[0])
+    
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+    
+    def close(self):
+        """Close the underlying database."""
+        with self._lock:
+            self._conn.close()
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache WHERE expires_at > ?", (time.time(),)
+            ).fetchone()[0]
+
+
+_MISSING = object()
+
+
+def _should_invalidate(result: Optional[dict]) -> bool:
+    """Rate limited or server error responses drop any cached entry."""
+    status = result.get('status_code') if result else None
+    return status is not None and (status == 429 or status >= 500)
+
+
+def ttl_cached(method):
+    """Cache successful results of a fetcher method in `self.response_cache`.
+    
+    The key is the method name plus its bound arguments (defaults applied),
+    so positional and keyword calls share entries. Only results with
+    'success' set are stored (not 'unchanged' ones, which carry no data),
+    and a 429 / 5xx result evicts the key. Cache hits come back with
+    'cached' set, since they may predate this cycle (or, from a disk cache,
+    this process) and aren't a new observation.
+    Works for both regular and async methods.
+    """
+    signature = inspect.signature(method)
+    
+    def make_key(self, args, kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        return (method.__name__,) + tuple(
+            (name, value) for name, value in bound.arguments.items() if name != 'self'
+        )
+    
+    def store(self, key, result):
+        if result and result.get('success'):
+            if not result.get('unchanged'):
+                self.response_cache.set(key, result)
+        elif _should_invalidate(result):
+            self.response_cache.pop(key)
+    
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, *args, **kwargs):
+            key = make_key(self, args, kwargs)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return {**cached, 'cached': True}
+            result = await method(self, *args, **kwargs)
+            store(self, key, result)
+            return result
+        return async_wrapper
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = make_key(self, args, kwargs)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            return {**cached, 'cached': True}
+        result = method(self, *args, **kwargs)
+        store(self, key, result)
+        return result
+    return wrapper
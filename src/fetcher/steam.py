@@ -1,17 +1,54 @@
 """Steam marketplace data fetcher."""
 
-import requests
-import time
 import logging
-from typing import Optional, Dict, Any
+import re
+from typing import Optional, Dict, Any, Iterable, List
 from urllib.parse import quote
-import yaml
 from pathlib import Path
+from src.fetcher._config import load_config
+from src.fetcher._http import NOT_MODIFIED, _SyncHTTPMixin, make_session
+from src.fetcher._ratelimit import TokenBucket
+from src.fetcher.cache import DiskTTLCache, TTLCache, ttl_cached
 
 logger = logging.getLogger(__name__)
 
+# Everything that isn't part of a number (currency symbols, thousands
+# separators, whitespace), stripped in one pass
+_PRICE_STRIP_RE = re.compile(r"[^\d.\-]")
 
-class SteamFetcher:
+# As above, but keeping the newlines that separate prices in a bulk parse
+_PRICE_STRIP_BULK_RE = re.compile(r"[^\d.\-\n]")
+
+
+def parse_prices_bulk(price_strs: Iterable[Optional[str]]) -> List[Optional[float]]:
+    """Parse many price strings at once, e.g. when backfilling history.
+    
+    Strips all strings in a single regex pass over their newline-joined
+    text instead of one pass per string. Gives the same values as
+    SteamFetcher._parse_price, without logging unparseable prices.
+    
+    Args:
+        price_strs: Price strings such as "$12.34"; None for missing prices
+    
+    Returns:
+        Parsed prices in input order, None where a price is missing or invalid
+    """
+    price_strs = [s or '' for s in price_strs]
+    cleaned = _PRICE_STRIP_BULK_RE.sub('', '\n'.join(price_strs)).split('\n')
+    if len(cleaned) != len(price_strs):
+        # An input contained a newline itself, so strip them one by one
+        cleaned = [_PRICE_STRIP_RE.sub('', s) for s in price_strs]
+    
+    prices = []
+    for text in cleaned:
+        try:
+            prices.append(float(text))
+        except ValueError:
+            prices.append(None)
+    return prices
+
+
+class SteamFetcher(_SyncHTTPMixin):
     """Fetches price data from Steam Community Market."""
     
     def __init__(self, config_path: str = "config.yaml"):
@@ -26,9 +63,24 @@ class SteamFetcher:
         self.max_retries = self.config.get('rate_limits', {}).get('steam', {}).get('max_retries', 3)
         self.currency_id = self.config.get('currency', {}).get('steam_currency_id', 3)
         
-        self.last_request_time = 0
-        self.request_count = 0
-        self.request_window_start = time.time()
+        # Bursts up to one minute's budget, then refills steadily
+        self.bucket = TokenBucket.per_minute(self.rate_limit)
+        
+        # Recent successful responses, reused within the TTL. Steam prices
+        # can also be kept on disk so restarts within the TTL skip the network.
+        cache_config = self.config.get('cache', {})
+        if cache_config.get('steam_disk_path'):
+            self.response_cache = DiskTTLCache(
+                cache_config['steam_disk_path'],
+                maxsize=cache_config.get('steam_disk_maxsize', 10000),
+                ttl=cache_config.get('steam_ttl_seconds', cache_config.get('ttl_seconds', 60)),
+                namespace=f"currency={self.currency_id}"
+            )
+        else:
+            self.response_cache = TTLCache(
+                maxsize=cache_config.get('maxsize', 1024),
+                ttl=cache_config.get('ttl_seconds', 60)
+            )
         
         # Headers
         self.headers = {
@@ -36,43 +88,53 @@ class SteamFetcher:
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
         }
+        
+        # Persistent session so requests reuse TCP/TLS connections, with a
+        # pooled connection for each puller worker
+        max_workers = self.config.get('puller', {}).get('max_workers', 8)
+        self._session = make_session(
+            self.headers, self.max_retries, pool_size=max_workers,
+            backoff_base=self.backoff_base, bucket=self.bucket
+        )
+        
+        # Last ETag per URL, sent back as If-None-Match on order/price requests
+        self._etags: Dict[Any, str] = {}
+    
+    def close(self):
+        """Close the HTTP session and its pooled connections."""
+        self._session.close()
+        if isinstance(self.response_cache, DiskTTLCache):
+            self.response_cache.close()
+    
+    def reset_cycle_cache(self, cycle_seconds: float = 0):
+        """Start a fetch cycle with an empty in-memory response cache.
+        
+        Repeat lookups of an item within the cycle reuse the first response,
+        and the next cycle always fetches fresh prices. Entries live for the
+        configured TTL, or cycle_seconds if that is longer, so a rate
+        limited cycle doesn't outlast them. A disk cache is left alone, it
+        is meant to outlive the process (its hits come back marked 'cached').
+        
+        Args:
+            cycle_seconds: Expected length of the cycle
+        """
+        if isinstance(self.response_cache, DiskTTLCache):
+            return
+        configured_ttl = self.config.get('cache', {}).get('ttl_seconds', 60)
+        self.response_cache.ttl = max(configured_ttl, cycle_seconds)
+        self.response_cache.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
     
     def _load_config(self, config_path: str) -> Dict:
         """Load configuration file."""
-        try:
-            with open(config_path, 'r') as f:
-                return yaml.safe_load(f)
-        except FileNotFoundError:
-            logger.warning(f"Config file {config_path} not found, using defaults")
-            return {}
-    
-    def _rate_limit(self):
-        """Enforce rate limiting."""
-        current_time = time.time()
-        
-        # Reset counter if window expired
-        if current_time - self.request_window_start >= 60:
-            self.request_count = 0
-            self.request_window_start = current_time
-        
-        # Check if we need to wait
-        if self.request_count >= self.rate_limit:
-            sleep_time = 60 - (current_time - self.request_window_start)
-            if sleep_time > 0:
-                logger.debug(f"Rate limit reached, sleeping {sleep_time:.2f}s")
-                time.sleep(sleep_time)
-                self.request_count = 0
-                self.request_window_start = time.time()
-        
-        # Enforce minimum time between requests
-        time_since_last = current_time - self.last_request_time
-        min_interval = 60.0 / self.rate_limit
-        if time_since_last < min_interval:
-            time.sleep(min_interval - time_since_last)
-        
-        self.last_request_time = time.time()
-        self.request_count += 1
+        return load_config(config_path)
     
+    @ttl_cached
     def fetch_price_overview(
         self,
         market_hash_name: str,
@@ -87,76 +149,61 @@ class SteamFetcher:
             currency_id: Currency ID (defaults to config value)
             
         Returns:
-            Dictionary with price data or None on error
+            Dictionary with price data (only success, unchanged, status_code
+            and latency_ms if the price is unchanged since the last fetch)
         """
+        url = self._price_overview_url(market_hash_name, app_id, currency_id)
+        status, data, latency_ms, error = self._get_json(
+            url, context=f"Steam priceoverview for {market_hash_name}", conditional=True
+        )
+        
+        if status == NOT_MODIFIED:
+            return self._unchanged_result(latency_ms)
+        if data is None:
+            return {
+                'success': False,
+                'error': error,
+                'status_code': status,
+                'latency_ms': latency_ms
+            }
+        return self._parse_price_overview(data, status, latency_ms)
+    
+    def _price_overview_url(
+        self,
+        market_hash_name: str,
+        app_id: int = 730,
+        currency_id: Optional[int] = None
+    ) -> str:
+        """Build the price overview URL for an item."""
         if currency_id is None:
             currency_id = self.currency_id
         
         # URL encode the market hash name
         encoded_name = quote(market_hash_name)
         
-        url = (
+        return (
             f"https://steamcommunity.com/market/priceoverview/"
             f"?appid={app_id}&currency={currency_id}&market_hash_name={encoded_name}"
         )
+    
+    def _parse_price_overview(self, data: Dict, status_code: int, latency_ms: int) -> Dict[str, Any]:
+        """Parse a price overview response into a result dictionary."""
+        result = {
+            'success': data.get('success', False),
+            'lowest_price': self._parse_price(data.get('lowest_price')),
+            'volume': data.get('volume', '0').replace(',', ''),
+            'median_price': self._parse_price(data.get('median_price')),
+            'raw_response': data,
+            'status_code': status_code,
+            'latency_ms': latency_ms
+        }
         
-        # Rate limiting
-        self._rate_limit()
-        
-        # Retry logic with exponential backoff
-        for attempt in range(self.max_retries):
-            try:
-                start_time = time.time()
-                response = requests.get(url, headers=self.headers, timeout=10)
-                latency_ms = int((time.time() - start_time) * 1000)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Parse Steam response
-                    result = {
-                        'success': data.get('success', False),
-                        'lowest_price': self._parse_price(data.get('lowest_price')),
-                        'volume': data.get('volume', '0').replace(',', ''),
-                        'median_price': self._parse_price(data.get('median_price')),
-                        'raw_response': data,
-                        'status_code': response.status_code,
-                        'latency_ms': latency_ms
-                    }
-                    
-                    # Extract best bid/ask from lowest_price (Steam shows lowest ask)
-                    result['best_ask'] = result['lowest_price']
-                    # Steam doesn't provide bid data in this endpoint, set to None
-                    result['best_bid'] = None
-                    
-                    return result
-                else:
-                    logger.warning(f"Steam API returned status {response.status_code} for {market_hash_name}")
-                    if attempt < self.max_retries - 1:
-                        sleep_time = self.backoff_base ** attempt
-                        time.sleep(sleep_time)
-                    else:
-                        return {
-                            'success': False,
-                            'error': f"HTTP {response.status_code}",
-                            'status_code': response.status_code,
-                            'latency_ms': latency_ms
-                        }
-            
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error fetching Steam data for {market_hash_name}: {e}")
-                if attempt < self.max_retries - 1:
-                    sleep_time = self.backoff_base ** attempt
-                    time.sleep(sleep_time)
-                else:
-                    return {
-                        'success': False,
-                        'error': str(e),
-                        'status_code': None,
-                        'latency_ms': None
-                    }
-        
-        return None
+        # Extract best bid/ask from lowest_price (Steam shows lowest ask)
+        result['best_ask'] = result['lowest_price']
+        # Steam doesn't provide bid data in this endpoint, set to None
+        result['best_bid'] = None
+        
+        return result
     
     def _parse_price(self, price_str: Optional[str]) -> Optional[float]:
         """Parse price string to float.
@@ -166,15 +213,12 @@ class SteamFetcher:
         if not price_str:
             return None
         
-        # Remove currency symbols and whitespace
+        # Remove currency symbols, separators and whitespace
         # This probably doesn't handle all edge cases but works for most
-        cleaned = price_str.replace('$', '').replace('€', '').replace('£', '')
-        cleaned = cleaned.replace(',', '').strip()
-        
         try:
-            return float(cleaned)
+            return float(_PRICE_STRIP_RE.sub('', price_str))
         except ValueError:
-            logger.warning(f"Could not parse price: {price_str}")
+            logger.warning("Could not parse price: %s", price_str)
             return None
 
 
@@ -2,245 +2,432 @@
 """Continuous data puller daemon."""
 
 import argparse
+import asyncio
+import json
 import logging
+import queue
+import random
+import signal
+import sqlite3
+import threading
 import time
 import sys
-from typing import List, Optional
-import yaml
-from src.db.client import DatabaseClient
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import aiohttp
+from src.db.client import DatabaseClient, dict_factory, utc_timestamp
+from src.fetcher._config import load_config
 from src.fetcher.steam import SteamFetcher
 from src.fetcher.buff import BuffFetcher
+from src.fetcher.aio import AsyncSteamFetcher, AsyncBuffFetcher, make_client_session
+from src.fetcher.cache import TTLCache
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/puller.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def setup_logging(log_config: dict) -> QueueListener:
+    """Route log records through a queue to file/console handlers.
+    
+    Worker threads only enqueue records. The file and console writes
+    happen on the listener's background thread.
+    
+    Args:
+        log_config: The config's 'logging' section (level, file, console)
+    
+    Returns:
+        Started QueueListener, stop() it on shutdown to flush pending records
+    """
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    
+    log_file = log_config.get('file', 'logs/puller.log')
+    if log_file:
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        # Bounded disk usage for a long-running daemon
+        handlers.append(RotatingFileHandler(log_file, maxBytes=100_000_000, backupCount=5))
+    if log_config.get('console', True):
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(log_config.get('level', 'INFO'))
+    root.addHandler(QueueHandler(log_queue))
+    
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+    return listener
+
 
 class PullerDaemon:
     """Continuous data puller for Steam and Buff marketplaces."""
     
+    # Bounds for the per-source backoff between fetches, in seconds
+    MIN_BACKOFF = 0.1
+    MAX_BACKOFF = 60.0
+    
+    # Fetch log rows (about one per fetch) buffered before a cycle writes
+    # what it has so far, so a crash mid-cycle loses at most this much
+    FLUSH_ROWS = 200
+    
+    # Seconds before a name with no Buff goods (or a rejected search) is searched again
+    SEARCH_RETRY_SECONDS = 3600
+    
     def __init__(
         self,
         config_path: str = "config.yaml",
         db_path: str = "db/arbitrage.sqlite",
-        interval_seconds: int = 300
+        interval_seconds: Optional[int] = None,
+        use_async: bool = False
     ):
         """Initialize puller daemon.
         
         Args:
             config_path: Path to config file
             db_path: Path to database file
-            interval_seconds: Interval between fetches in seconds
+            interval_seconds: Interval between fetches in seconds (default:
+                puller.interval_seconds from config, else 300)
+            use_async: Fetch all items concurrently with the aiohttp
+                fetchers (run_once_async) instead of one by one
         """
         self.config_path = config_path
         self.config = self._load_config(config_path)
         self.db_path = db_path
+        if interval_seconds is None:
+            interval_seconds = self.config.get('puller', {}).get('interval_seconds', 300)
         self.interval_seconds = interval_seconds
+        self.use_async = use_async
         
         # Initialize components
-        self.db_client = DatabaseClient(db_path)
+        db_config = self.config.get('database', {})
+        self.db_client = DatabaseClient(
+            db_path,
+            store_raw=db_config.get('store_raw', False),
+            raw_codec=db_config.get('raw_codec', 'zlib')
+        )
         self.steam_fetcher = SteamFetcher(config_path)
         self.buff_fetcher = BuffFetcher(config_path)
         
-        # Items to track (empty = all items in DB)
+        # Items to track (empty = all items in DB). The query is built once,
+        # so its text (and prepared statement) is the same every cycle. The
+        # IDs go in as one JSON array expanded by json_each, so the SQL
+        # doesn't grow a placeholder per item (or hit SQLite's variable limit).
         self.items_to_track = self.config.get('puller', {}).get('items_to_track', [])
+        if self.items_to_track:
+            self._items_sql = """
+                SELECT item_id, market_hash_name, buff_goods_id
+                FROM items
+                WHERE item_id IN (SELECT value FROM json_each(?))
+            """
+            self._items_params = (json.dumps(self.items_to_track),)
+        else:
+            self._items_sql = """
+                SELECT item_id, market_hash_name, buff_goods_id
+                FROM items
+            """
+            self._items_params = ()
+        
+        # Concurrent fetches per source in run_once, items in flight in
+        # run_once_async
+        self.max_workers = self.config.get('puller', {}).get('max_workers', 8)
+        
+        # market_hash_name -> Buff goods ID found by search. The items table
+        # is the persistent copy; this covers rows whose write hasn't landed.
+        self._goods_ids: Dict[str, int] = {}
+        
+        # market_hash_names whose Buff search failed or matched nothing.
+        # Those items skip Buff until the entry expires, rather than
+        # spending a search request every cycle.
+        self._failed_searches = TTLCache(maxsize=10000, ttl=self.SEARCH_RETRY_SECONDS)
+        
+        # Per-source pause after each fetch in run_once, in seconds. Halves
+        # on success, doubles on 429 / 5xx / connection errors.
+        self._backoff = {'steam': self.MIN_BACKOFF, 'buff': self.MIN_BACKOFF}
+        self._backoff_lock = threading.Lock()
+        
+        # One flush at a time, mid-cycle flushes race with workers' appends
+        self._flush_lock = threading.Lock()
+        
+        # Set by stop() or SIGTERM/SIGINT during run(). Fetches not yet
+        # started are skipped, and rows already collected are still flushed.
+        self._stop = threading.Event()
+        
+        # With use_async, cycles run on one event loop that outlives them, so
+        # the aiohttp session (pooled connections, DNS cache) and the async
+        # fetchers (token buckets, limiters) do too. All are created by the
+        # first async cycle and released by close().
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._async_fetchers: Optional[Tuple[AsyncSteamFetcher, AsyncBuffFetcher]] = None
     
     def _load_config(self, config_path: str) -> dict:
         """Load configuration file."""
-        try:
-            with open(config_path, 'r') as f:
-                return yaml.safe_load(f)
-        except FileNotFoundError:
-            logger.warning(f"Config file {config_path} not found, using defaults")
-            return {}
+        return load_config(config_path)
+    
+    def stop(self):
+        """Ask the daemon to stop once in-flight fetches finish."""
+        self._stop.set()
+    
+    def _handle_signal(self, signum, frame):
+        logger.info(f"Received {signal.Signals(signum).name}, stopping after in-flight fetches")
+        self.stop()
     
     def get_items_to_fetch(self) -> List[dict]:
         """Get list of items to fetch data for.
         
         Returns:
-            List of item dictionaries with item_id and market_hash_name
+            List of item dictionaries with item_id, market_hash_name and
+            buff_goods_id
         """
-        conn = self.db_client.get_connection()
-        cursor = conn.cursor()
+        with self.db_client.connection() as conn:
+            # Rows come back as plain dicts, which the fetch methods update
+            cursor = conn.cursor()
+            cursor.row_factory = dict_factory
+            cursor.execute(self._items_sql, self._items_params)
+            return cursor.fetchall()
+    
+    def _update_backoff(self, source: str, result: Optional[dict]):
+        """Adjust a source's backoff from a fetch result (None for errors)."""
+        status = result.get('status_code') if result else None
+        with self._backoff_lock:
+            if result and result.get('success'):
+                self._backoff[source] = max(self.MIN_BACKOFF, self._backoff[source] * 0.5)
+            elif status is None or status == 429 or status >= 500:
+                self._backoff[source] = min(self.MAX_BACKOFF, self._backoff[source] * 2)
+    
+    def _remember_failed_search(self, name: str, result: Optional[dict]):
+        """Skip Buff searches for a name for a while after a failed search.
         
-        if self.items_to_track:
-            # Fetch specific items
-            placeholders = ','.join('?' * len(self.items_to_track))
-            cursor.execute(f"""
-                SELECT item_id, market_hash_name, buff_goods_id
-                FROM items
-                WHERE item_id IN ({placeholders})
-            """, self.items_to_track)
-        else:
-            # Fetch all items
-            cursor.execute("""
-                SELECT item_id, market_hash_name, buff_goods_id
-                FROM items
-            """)
+        Only client errors (4xx other than 429) are remembered; rate limits,
+        server errors and connection errors are retried next cycle.
+        """
+        status = result.get('status_code') if result else None
+        if status is not None and 400 <= status < 500 and status != 429:
+            self._failed_searches.set(name, True)
+    
+    def _fetch_paced(self, source: str, fetch, item: dict, rows: Dict[str, list]) -> bool:
+        """Run one fetch, then pause for the source's jittered backoff."""
+        if self._stop.is_set():
+            return False
+        try:
+            return fetch(item, rows)
+        finally:
+            # Jitter keeps workers from retrying in lockstep
+            time.sleep(self._backoff[source] * random.uniform(1.0, 1.5))
+    
+    @staticmethod
+    def _is_new_observation(result: dict) -> bool:
+        """Whether a successful fetch result should get a snapshot row.
         
-        rows = cursor.fetchall()
-        conn.close()
+        Unchanged (304) results keep the last snapshot, and cache hits are an
+        earlier observation, possibly from a previous run's disk cache.
+        """
+        return not (result.get('unchanged') or result.get('cached'))
+    
+    @staticmethod
+    def _new_rows() -> Dict[str, list]:
+        """Empty lists of pending 'steam', 'buff', 'logs' and 'goods' rows."""
+        return {'steam': [], 'buff': [], 'logs': [], 'goods': []}
+    
+    def _flush_rows(self, rows: Dict[str, list]) -> bool:
+        """Write pending rows to the database in a single transaction.
         
-        return [dict(row) for row in rows]
+        The written rows are removed from rows; rows appended by other
+        workers meanwhile stay for the next flush. A batch that fails to
+        write is logged and dropped rather than ending the cycle, and the
+        ETags of its source are forgotten so the next cycle refetches it.
+        
+        Returns:
+            True if the batch was written
+        """
+        with self._flush_lock:
+            batch = {}
+            for key, pending in rows.items():
+                count = len(pending)
+                batch[key] = pending[:count]
+                # Workers only append, so this removes exactly the copied rows
+                del pending[:count]
+            
+            try:
+                self.db_client.flush_batch(batch['steam'], batch['buff'], batch['logs'], batch['goods'])
+            except sqlite3.Error as e:
+                logger.error(
+                    f"Failed to write batch ({len(batch['steam'])} Steam, {len(batch['buff'])} Buff "
+                    f"snapshots, {len(batch['logs'])} fetch logs), dropping it: {e}",
+                    exc_info=True
+                )
+                # The dropped snapshots' ETags are already stored, so the
+                # next requests would get 304s and never write those prices.
+                # Forget them (the async fetchers share these stores).
+                if batch['steam']:
+                    self.steam_fetcher.etags.clear()
+                if batch['buff']:
+                    self.buff_fetcher.etags.clear()
+                return False
+            return True
     
-    def fetch_steam_data(self, item: dict) -> bool:
+    def _maybe_flush_rows(self, rows: Dict[str, list]):
+        """Flush rows mid-cycle once FLUSH_ROWS fetches are pending."""
+        if len(rows['logs']) >= self.FLUSH_ROWS:
+            self._flush_rows(rows)
+    
+    def fetch_steam_data(self, item: dict, rows: Optional[Dict[str, list]] = None) -> bool:
         """Fetch Steam data for an item.
         
         Args:
             item: Item dictionary with item_id and market_hash_name
-            
+            rows: Pending rows (see _new_rows) to append results to. If None,
+                results are written right away.
+        
         Returns:
             True if successful, False otherwise
         """
+        if rows is None:
+            rows = self._new_rows()
+            try:
+                return self.fetch_steam_data(item, rows)
+            finally:
+                self._flush_rows(rows)
+        
+        item_id = item['item_id']
         try:
             result = self.steam_fetcher.fetch_price_overview(
                 item['market_hash_name']
             )
+            self._update_backoff('steam', result)
             
             if result and result.get('success'):
-                # Insert snapshot
-                self.db_client.insert_steam_snapshot(
-                    item_id=item['item_id'],
-                    best_bid=result.get('best_bid'),
-                    best_ask=result.get('best_ask'),
-                    median_price=result.get('median_price'),
-                    lowest_price=result.get('lowest_price'),
-                    highest_price=result.get('highest_price'),
-                    raw_response=result.get('raw_response')
-                )
+                # Snapshot row (an unchanged or cached price keeps the last one)
+                if self._is_new_observation(result):
+                    rows['steam'].append((
+                        item_id, utc_timestamp(),
+                        result.get('best_bid'), result.get('best_ask'), None, None,
+                        result.get('median_price'), result.get('lowest_price'),
+                        result.get('highest_price'), self.steam_fetcher.currency_id,
+                        result.get('raw_response')
+                    ))
                 
                 # Log fetch
-                self.db_client.log_fetch(
-                    source='steam',
-                    endpoint='priceoverview',
-                    status_code=result.get('status_code'),
-                    latency_ms=result.get('latency_ms'),
-                    success=True,
-                    item_id=item['item_id']
-                )
+                rows['logs'].append((
+                    'steam', 'priceoverview', utc_timestamp(), result.get('status_code'),
+                    result.get('latency_ms'), True, None, item_id
+                ))
                 
                 return True
             else:
                 error_msg = result.get('error', 'Unknown error') if result else 'No response'
                 logger.warning(f"Failed to fetch Steam data for {item['market_hash_name']}: {error_msg}")
                 
-                self.db_client.log_fetch(
-                    source='steam',
-                    endpoint='priceoverview',
-                    status_code=result.get('status_code') if result else None,
-                    latency_ms=result.get('latency_ms') if result else None,
-                    success=False,
-                    error_message=error_msg,
-                    item_id=item['item_id']
-                )
+                rows['logs'].append((
+                    'steam', 'priceoverview', utc_timestamp(),
+                    result.get('status_code') if result else None,
+                    result.get('latency_ms') if result else None,
+                    False, error_msg, item_id
+                ))
                 
                 return False
         
         except Exception as e:
+            self._update_backoff('steam', None)
             logger.error(f"Error fetching Steam data for {item['market_hash_name']}: {e}")
-            self.db_client.log_fetch(
-                source='steam',
-                endpoint='priceoverview',
-                success=False,
-                error_message=str(e),
-                item_id=item['item_id']
-            )
+            rows['logs'].append(('steam', 'priceoverview', utc_timestamp(), None, None, False, str(e), item_id))
             return False
     
-    def fetch_buff_data(self, item: dict) -> bool:
+    def fetch_buff_data(self, item: dict, rows: Optional[Dict[str, list]] = None) -> bool:
         """Fetch Buff data for an item.
         
         Args:
             item: Item dictionary with item_id, market_hash_name, and buff_goods_id
-            
+            rows: Pending rows (see _new_rows) to append results to. If None,
+                results are written right away.
+        
         Returns:
             True if successful, False otherwise
         """
+        if rows is None:
+            rows = self._new_rows()
+            try:
+                return self.fetch_buff_data(item, rows)
+            finally:
+                self._flush_rows(rows)
+        
+        item_id = item['item_id']
         try:
             # Need buff_goods_id to fetch orders
             # This is a bit hacky - search might fail if auth is bad
+            name = item['market_hash_name']
+            if not item.get('buff_goods_id') and name in self._goods_ids:
+                # Resolved before but not stored on the row yet, queue it again
+                item['buff_goods_id'] = self._goods_ids[name]
+                rows['goods'].append((name, item['buff_goods_id']))
+            
             if not item.get('buff_goods_id'):
+                if name in self._failed_searches:
+                    logger.debug(f"Skipping Buff for {name}, search failed recently")
+                    return False
+                
                 # Try to search for it
                 search_result = self.buff_fetcher.search_goods(item['market_hash_name'])
+                self._update_backoff('buff', search_result)
                 if search_result and search_result.get('success'):
                     items = search_result.get('data', {}).get('items', [])
                     if items:
                         goods_id = items[0].get('id')
-                        # Update item in DB
-                        conn = self.db_client.get_connection()
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            UPDATE items 
-                            SET buff_goods_id = ?, updated_at = CURRENT_TIMESTAMP
-                            WHERE item_id = ?
-                        """, (goods_id, item['item_id']))
-                        conn.commit()
-                        conn.close()
-                        item['buff_goods_id'] = goods_id
+                        # Stored on the item row with the cycle's batch write
+                        item['buff_goods_id'] = self._goods_ids[name] = goods_id
+                        rows['goods'].append((name, goods_id))
                     else:
                         logger.warning(f"No Buff goods found for {item['market_hash_name']}")
+                        self._failed_searches.set(name, True)
                         return False
                 else:
                     logger.warning(f"Failed to search Buff for {item['market_hash_name']}")
+                    self._remember_failed_search(name, search_result)
                     return False
             
             # Fetch sell orders (asks)
             sell_result = self.buff_fetcher.get_sell_orders(item['buff_goods_id'])
+            self._update_backoff('buff', sell_result)
             
             if sell_result and sell_result.get('success'):
-                best_ask = sell_result.get('best_ask')
-                order_count = sell_result.get('order_count', 0)
-                
-                # Insert snapshot
-                self.db_client.insert_buff_snapshot(
-                    item_id=item['item_id'],
-                    best_ask=best_ask,
-                    sell_order_count=order_count,
-                    raw_response=sell_result.get('raw_response')
-                )
+                # Snapshot row (unchanged or cached orders keep the last one)
+                if self._is_new_observation(sell_result):
+                    rows['buff'].append((
+                        item_id, utc_timestamp(),
+                        sell_result.get('best_ask'), None, None, None,
+                        sell_result.get('order_count', 0), None, 'CNY',
+                        sell_result.get('raw_response')
+                    ))
                 
                 # Log fetch
-                self.db_client.log_fetch(
-                    source='buff',
-                    endpoint='sell_order',
-                    status_code=sell_result.get('status_code'),
-                    latency_ms=sell_result.get('latency_ms'),
-                    success=True,
-                    item_id=item['item_id']
-                )
+                rows['logs'].append((
+                    'buff', 'sell_order', utc_timestamp(), sell_result.get('status_code'),
+                    sell_result.get('latency_ms'), True, None, item_id
+                ))
                 
                 return True
             else:
                 error_msg = 'Failed to fetch sell orders'
                 logger.warning(f"Failed to fetch Buff data for {item['market_hash_name']}: {error_msg}")
                 
-                self.db_client.log_fetch(
-                    source='buff',
-                    endpoint='sell_order',
-                    status_code=sell_result.get('status_code') if sell_result else None,
-                    latency_ms=sell_result.get('latency_ms') if sell_result else None,
-                    success=False,
-                    error_message=error_msg,
-                    item_id=item['item_id']
-                )
+                rows['logs'].append((
+                    'buff', 'sell_order', utc_timestamp(),
+                    sell_result.get('status_code') if sell_result else None,
+                    sell_result.get('latency_ms') if sell_result else None,
+                    False, error_msg, item_id
+                ))
                 
                 return False
         
         except Exception as e:
+            self._update_backoff('buff', None)
             logger.error(f"Error fetching Buff data for {item['market_hash_name']}: {e}")
-            self.db_client.log_fetch(
-                source='buff',
-                endpoint='sell_order',
-                success=False,
-                error_message=str(e),
-                item_id=item['item_id']
-            )
+            rows['logs'].append(('buff', 'sell_order', utc_timestamp(), None, None, False, str(e), item_id))
             return False
     
     def run_once(self):
@@ -252,45 +439,283 @@ class PullerDaemon:
             return
         
         logger.info(f"Fetching data for {len(items)} items...")
+        self.steam_fetcher.reset_cycle_cache(self.interval_seconds)
+        self.buff_fetcher.reset_cycle_cache(self.interval_seconds)
+        
+        # One pool per source, so a slow response only holds up its own
+        # worker. Pacing comes from the fetchers' token buckets plus a
+        # per-source backoff. Rows are collected (list.append is
+        # thread-safe) and written one transaction per FLUSH_ROWS fetches,
+        # plus once at the end.
+        rows = self._new_rows()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='steam') as steam_pool, \
+                ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='buff') as buff_pool:
+            steam_futures = [
+                steam_pool.submit(self._fetch_paced, 'steam', self.fetch_steam_data, item, rows)
+                for item in items
+            ]
+            buff_futures = [
+                buff_pool.submit(self._fetch_paced, 'buff', self.fetch_buff_data, item, rows)
+                for item in items
+            ]
+            
+            sources = {future: 'steam' for future in steam_futures}
+            sources.update((future, 'buff') for future in buff_futures)
+            successes = {'steam': 0, 'buff': 0}
+            for future in as_completed(sources):
+                successes[sources[future]] += future.result()
+                self._maybe_flush_rows(rows)
+        
+        self._flush_rows(rows)
+        steam_success, buff_success = successes['steam'], successes['buff']
+        
+        logger.info(
+            f"Fetch cycle complete: Steam {steam_success}/{len(items)}, "
+            f"Buff {buff_success}/{len(items)}"
+        )
+    
+    async def _fetch_item_async(
+        self,
+        steam_fetcher: AsyncSteamFetcher,
+        buff_fetcher: AsyncBuffFetcher,
+        item: dict,
+        rows: Dict[str, list]
+    ) -> List[bool]:
+        """Fetch Steam and Buff data for one item, collecting rows for bulk insert.
         
-        steam_success = 0
-        buff_success = 0
+        Args:
+            steam_fetcher: Async Steam fetcher
+            buff_fetcher: Async Buff fetcher
+            item: Item dictionary with item_id, market_hash_name, and buff_goods_id
+            rows: Lists of pending 'steam', 'buff', 'logs' and 'goods' rows
         
-        for item in items:
-            # Fetch Steam data
-            if self.fetch_steam_data(item):
-                steam_success += 1
+        Returns:
+            [steam_ok, buff_ok]
+        """
+        item_id = item['item_id']
+        name = item['market_hash_name']
+        
+        async def fetch_steam() -> bool:
+            try:
+                result = await steam_fetcher.fetch_price_overview(name)
+            except Exception as e:
+                logger.error(f"Error fetching Steam data for {name}: {e}")
+                rows['logs'].append(('steam', 'priceoverview', utc_timestamp(), None, None, False, str(e), item_id))
+                return False
             
-            # Small delay between items
-            time.sleep(1)
+            if result and result.get('success'):
+                if self._is_new_observation(result):
+                    rows['steam'].append((
+                        item_id, utc_timestamp(),
+                        result.get('best_bid'), result.get('best_ask'), None, None,
+                        result.get('median_price'), result.get('lowest_price'),
+                        result.get('highest_price'), steam_fetcher.currency_id,
+                        result.get('raw_response')
+                    ))
+                rows['logs'].append((
+                    'steam', 'priceoverview', utc_timestamp(), result.get('status_code'),
+                    result.get('latency_ms'), True, None, item_id
+                ))
+                return True
             
-            # Fetch Buff data
-            if self.fetch_buff_data(item):
-                buff_success += 1
+            error_msg = result.get('error', 'Unknown error') if result else 'No response'
+            logger.warning(f"Failed to fetch Steam data for {name}: {error_msg}")
+            rows['logs'].append((
+                'steam', 'priceoverview', utc_timestamp(),
+                result.get('status_code') if result else None,
+                result.get('latency_ms') if result else None,
+                False, error_msg, item_id
+            ))
+            return False
+        
+        async def fetch_buff() -> bool:
+            try:
+                if not item.get('buff_goods_id') and name in self._goods_ids:
+                    item['buff_goods_id'] = self._goods_ids[name]
+                    rows['goods'].append((name, item['buff_goods_id']))
+                
+                if not item.get('buff_goods_id'):
+                    if name in self._failed_searches:
+                        logger.debug(f"Skipping Buff for {name}, search failed recently")
+                        return False
+                    search_result = await buff_fetcher.search_goods(name)
+                    if not (search_result and search_result.get('success')):
+                        logger.warning(f"Failed to search Buff for {name}")
+                        self._remember_failed_search(name, search_result)
+                        return False
+                    goods = search_result.get('data', {}).get('items', [])
+                    if not goods:
+                        logger.warning(f"No Buff goods found for {name}")
+                        self._failed_searches.set(name, True)
+                        return False
+                    item['buff_goods_id'] = self._goods_ids[name] = goods[0].get('id')
+                    rows['goods'].append((name, item['buff_goods_id']))
+                
+                sell_result = await buff_fetcher.get_sell_orders(item['buff_goods_id'])
+            except Exception as e:
+                logger.error(f"Error fetching Buff data for {name}: {e}")
+                rows['logs'].append(('buff', 'sell_order', utc_timestamp(), None, None, False, str(e), item_id))
+                return False
+            
+            if sell_result and sell_result.get('success'):
+                if self._is_new_observation(sell_result):
+                    rows['buff'].append((
+                        item_id, utc_timestamp(),
+                        sell_result.get('best_ask'), None, None, None,
+                        sell_result.get('order_count', 0), None, 'CNY',
+                        sell_result.get('raw_response')
+                    ))
+                rows['logs'].append((
+                    'buff', 'sell_order', utc_timestamp(), sell_result.get('status_code'),
+                    sell_result.get('latency_ms'), True, None, item_id
+                ))
+                return True
             
-            # Small delay between items
-            time.sleep(1)
+            logger.warning(f"Failed to fetch Buff data for {name}: Failed to fetch sell orders")
+            rows['logs'].append((
+                'buff', 'sell_order', utc_timestamp(),
+                sell_result.get('status_code') if sell_result else None,
+                sell_result.get('latency_ms') if sell_result else None,
+                False, 'Failed to fetch sell orders', item_id
+            ))
+            return False
+        
+        return list(await asyncio.gather(fetch_steam(), fetch_buff()))
+    
+    def _get_async_fetchers(self) -> Tuple[AsyncSteamFetcher, AsyncBuffFetcher]:
+        """Async fetchers and their shared session, created on first use.
         
+        Must be called from the daemon's event loop.
+        """
+        if self._async_fetchers is None:
+            # Each in-flight item may have its Buff sell and buy order
+            # requests open together, so allow two connections per worker
+            self._session = make_client_session(
+                limit=4 * self.max_workers, limit_per_host=2 * self.max_workers
+            )
+            # ETags are shared with the sync fetchers, so conditional
+            # requests carry over whichever path made the last request
+            self._async_fetchers = (
+                AsyncSteamFetcher(self.config_path, session=self._session, etags=self.steam_fetcher.etags),
+                AsyncBuffFetcher(self.config_path, session=self._session, etags=self.buff_fetcher.etags)
+            )
+        return self._async_fetchers
+    
+    async def _close_async(self):
+        """Close the async fetchers, then the session they share."""
+        if self._async_fetchers is not None:
+            for fetcher in self._async_fetchers:
+                await fetcher.close()
+            self._async_fetchers = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def run_once_async(self):
+        """Run one fetch cycle with all items fetched concurrently.
+        
+        Up to max_workers items are in flight at once, requests overlap up
+        to the fetchers' rate limits, and results are written one
+        transaction per FLUSH_ROWS fetches plus once at the end.
+        """
+        items = self.get_items_to_fetch()
+        
+        if not items:
+            logger.warning("No items to fetch. Add items to database first.")
+            return
+        
+        logger.info(f"Fetching data for {len(items)} items (async)...")
+        
+        rows = self._new_rows()
+        steam_fetcher, buff_fetcher = self._get_async_fetchers()
+        steam_fetcher.reset_cycle_cache(self.interval_seconds)
+        buff_fetcher.reset_cycle_cache(self.interval_seconds)
+        
+        # At most max_workers items in progress at once
+        semaphore = asyncio.Semaphore(self.max_workers)
+        
+        async def fetch_item(item: dict) -> List[bool]:
+            async with semaphore:
+                if self._stop.is_set():
+                    return [False, False]
+                outcome = await self._fetch_item_async(steam_fetcher, buff_fetcher, item, rows)
+                self._maybe_flush_rows(rows)
+                return outcome
+        
+        outcomes = await asyncio.gather(*(fetch_item(item) for item in items))
+        
+        self._flush_rows(rows)
+        
+        steam_success = sum(steam_ok for steam_ok, _ in outcomes)
+        buff_success = sum(buff_ok for _, buff_ok in outcomes)
         logger.info(
             f"Fetch cycle complete: Steam {steam_success}/{len(items)}, "
             f"Buff {buff_success}/{len(items)}"
         )
     
+    def run_cycle(self):
+        """Run one fetch cycle with the configured (sync or async) strategy."""
+        if self.use_async:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.run_once_async())
+        else:
+            self.run_once()
+    
+    def close(self):
+        """Release the HTTP sessions, the event loop and the database."""
+        if self._loop is not None:
+            self._loop.run_until_complete(self._close_async())
+            self._loop.close()
+            self._loop = None
+        self.steam_fetcher.close()
+        self.buff_fetcher.close()
+        self.db_client.close()
+    
     def run(self):
         """Run continuous puller loop."""
         logger.info(f"Starting puller daemon (interval: {self.interval_seconds}s)")
         
+        # SIGTERM (systemd, docker stop) and Ctrl-C end the loop after the
+        # current fetches, so the cycle's batch is written and the database
+        # closed cleanly. Handlers can only be installed from the main thread.
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous_handlers[signum] = signal.signal(signum, self._handle_signal)
+        
         try:
-            while True:
-                self.run_once()
-                logger.info(f"Sleeping for {self.interval_seconds} seconds...")
-                time.sleep(self.interval_seconds)
+            # Cycles start on a fixed monotonic schedule, so the cycle's own
+            # duration doesn't add to the period
+            deadline = time.monotonic()
+            while not self._stop.is_set():
+                self.run_cycle()
+                # Periodic PRAGMA optimize / WAL truncate, between cycles
+                self.db_client.maybe_run_maintenance()
+                
+                deadline += self.interval_seconds
+                now = time.monotonic()
+                if deadline < now:
+                    # Overran the interval: start the next cycle now, and
+                    # skip ahead rather than trying to catch up
+                    logger.warning(f"Fetch cycle overran the {self.interval_seconds}s interval")
+                    deadline = now
+                
+                if not self._stop.is_set():
+                    logger.info(f"Sleeping for {deadline - now:.1f} seconds...")
+                    self._stop.wait(deadline - now)
+            
+            logger.info("Puller daemon stopped")
         
         except KeyboardInterrupt:
             logger.info("Puller daemon stopped by user")
         except Exception as e:
             logger.error(f"Puller daemon error: {e}", exc_info=True)
             raise
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            self.close()
 
 
 def main():
@@ -321,34 +746,36 @@ def main():
         action='store_true',
         help='Run once instead of continuously'
     )
+    parser.add_argument(
+        '--async',
+        dest='use_async',
+        action='store_true',
+        help='Fetch items concurrently with the aiohttp fetchers'
+    )
     
     args = parser.parse_args()
     
-    # Load config to get default interval
-    try:
-        with open(args.config, 'r') as f:
-            config = yaml.safe_load(f)
-        default_interval = config.get('puller', {}).get('interval_seconds', 300)
-    except:
-        default_interval = 300
-    
-    interval = args.interval if args.interval is not None else default_interval
-    
-    # Ensure logs directory exists
-    import os
-    os.makedirs('logs', exist_ok=True)
-    
-    # Initialize and run daemon
-    daemon = PullerDaemon(
-        config_path=args.config,
-        db_path=args.db_path,
-        interval_seconds=interval
-    )
+    # Same cached parse the daemon uses below
+    listener = setup_logging(load_config(args.config).get('logging', {}))
     
-    if args.once:
-        daemon.run_once()
-    else:
-        daemon.run()
+    try:
+        # Initialize and run daemon
+        daemon = PullerDaemon(
+            config_path=args.config,
+            db_path=args.db_path,
+            interval_seconds=args.interval,
+            use_async=args.use_async
+        )
+        
+        if args.once:
+            try:
+                daemon.run_cycle()
+            finally:
+                daemon.close()
+        else:
+            daemon.run()
+    finally:
+        listener.stop()
 
 
 if __name__ == "__main__":
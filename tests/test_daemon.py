@@ -0,0 +1,429 @@
+"""Tests for the puller daemon."""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import signal
+import sqlite3
+import sys
+import threading
+import time
+import types
+import pytest
+import requests
+import responses
+from aiohttp import web
+from migrations.init_db import init_database
+from src.fetcher.buff import BuffFetcher
+from src.fetcher.cache import DiskTTLCache
+from src.fetcher.steam import SteamFetcher
+from src.puller import daemon as daemon_module
+from src.puller.daemon import PullerDaemon
+
+STEAM_PRICE_URL = re.compile(r"https://steamcommunity\.com/market/priceoverview/.*")
+
+# Buff goods ID the canned search finds for each test item
+GOODS_IDS = {"Item A": 77, "Item B": 78, "Item C": 79}
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """Daemon on a fresh database, with no pause between fetches."""
+    db_path = str(tmp_path / "test.sqlite")
+    init_database(db_path)
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("puller:\n  interval_seconds: 60\n  max_workers: 2\n")
+    
+    daemon = PullerDaemon(str(config_path), db_path)
+    daemon.MIN_BACKOFF = 0.0
+    daemon._backoff = {'steam': 0.0, 'buff': 0.0}
+    yield daemon
+    daemon.close()
+
+
+@pytest.fixture
+def market():
+    """Canned Steam and Buff responses for every item."""
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.add(responses.GET, STEAM_PRICE_URL, json={
+            'success': True, 'lowest_price': '$10.50', 'volume': '12', 'median_price': '$11.00'
+        })
+        rsps.add_callback(responses.GET, BuffFetcher.SEARCH_URL, callback=lambda request: (
+            200, {}, json.dumps({'items': [{'id': GOODS_IDS[request.params['search']]}]})
+        ))
+        rsps.add(responses.GET, BuffFetcher.SELL_ORDER_URL, json={'data': {'items': [{'price': '8.50'}]}})
+        yield rsps
+
+
+@pytest.fixture
+def local_market(monkeypatch):
+    """Local aiohttp server with canned responses, fetchers pointed at it.
+    
+    Yields the list of request paths served. The server runs on its own
+    loop in a thread, since the daemon runs async cycles on its own loop.
+    """
+    paths = []
+    
+    async def handler(request):
+        paths.append(request.path)
+        if request.path == '/search':
+            return web.json_response({'items': [{'id': GOODS_IDS[request.query['search']]}]})
+        if request.path == '/sell_order':
+            return web.json_response({'data': {'items': [{'price': '8.50'}]}})
+        return web.json_response({'success': True, 'lowest_price': '$10.50', 'volume': '12'})
+    
+    app = web.Application()
+    app.router.add_get('/{tail:.*}', handler)
+    runner = web.AppRunner(app)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', 0).start())
+    base_url = "http://127.0.0.1:%d" % runner.addresses[0][1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    
+    monkeypatch.setattr(SteamFetcher, '_price_overview_url', lambda self, *args, **kwargs: f"{base_url}/priceoverview")
+    monkeypatch.setattr(BuffFetcher, 'SEARCH_URL', f"{base_url}/search")
+    monkeypatch.setattr(BuffFetcher, 'SELL_ORDER_URL', f"{base_url}/sell_order")
+    yield paths
+    
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def count_rows(daemon, table):
+    with daemon.db_client.connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def next_tick():
+    """Wait for the next fetch timestamp (they have millisecond resolution).
+    
+    Back-to-back test cycles can otherwise finish within the same millisecond
+    and collide on UNIQUE(item_id, timestamp).
+    """
+    time.sleep(0.002)
+
+
+class TestBatchFlush:
+    """Test cases for buffered cycle writes."""
+    
+    def test_cycles_keep_fetch_times(self, daemon, market):
+        """Test back-to-back cycles don't collide on UNIQUE(item_id, timestamp)."""
+        for name in ("Item A", "Item B"):
+            daemon.db_client.get_or_create_item(name)
+        
+        daemon.run_once()
+        next_tick()
+        daemon.run_once()
+        
+        assert count_rows(daemon, "steam_snapshots") == 4
+        assert count_rows(daemon, "buff_snapshots") == 4
+        assert count_rows(daemon, "fetch_logs") == 8
+    
+    def test_cycles_fetch_fresh_orders(self, daemon, market):
+        """Test each cycle fetches Buff orders, even within the cache TTL."""
+        daemon.db_client.get_or_create_item("Item A", buff_goods_id=77)
+        daemon.interval_seconds = 10
+        
+        daemon.run_once()
+        next_tick()
+        daemon.run_once()
+        
+        sell_order_calls = [call for call in market.calls if call.request.url.startswith(BuffFetcher.SELL_ORDER_URL)]
+        assert len(sell_order_calls) == 2
+    
+    def test_disk_cached_prices_not_snapshotted(self, daemon, market, tmp_path):
+        """Test Steam prices served from the disk cache aren't recorded as new observations."""
+        daemon.db_client.get_or_create_item("Item A", buff_goods_id=77)
+        # Outlives the cycle, like steam_ttl_seconds: 600 with a 300s interval
+        daemon.steam_fetcher.response_cache = DiskTTLCache(str(tmp_path / "steam.sqlite"), ttl=600)
+        
+        daemon.run_once()
+        next_tick()
+        daemon.run_once()
+        
+        assert count_rows(daemon, "steam_snapshots") == 1
+        assert count_rows(daemon, "buff_snapshots") == 2
+        assert sum(bool(STEAM_PRICE_URL.match(call.request.url)) for call in market.calls) == 1
+    
+    def test_flushes_mid_cycle(self, daemon, market, monkeypatch):
+        """Test rows are written every FLUSH_ROWS fetches, not only at the end."""
+        for name in ("Item A", "Item B", "Item C"):
+            daemon.db_client.get_or_create_item(name)
+        daemon.FLUSH_ROWS = 2
+        
+        batches = []
+        flush_batch = daemon.db_client.flush_batch
+        def record(steam_rows, buff_rows, log_rows, goods_rows=()):
+            batches.append(len(log_rows))
+            flush_batch(steam_rows, buff_rows, log_rows, goods_rows)
+        monkeypatch.setattr(daemon.db_client, 'flush_batch', record)
+        
+        daemon.run_once()
+        
+        assert len(batches) > 1
+        assert sum(batches) == 6
+        assert count_rows(daemon, "fetch_logs") == 6
+    
+    def test_failed_flush_is_dropped(self, daemon, caplog):
+        """Test a batch that fails to write is logged and dropped."""
+        item_id = daemon.db_client.get_or_create_item("Item A")
+        rows = daemon._new_rows()
+        # fetch_logs.source is NOT NULL
+        rows['logs'].append((None, 'priceoverview', None, 200, 5, True, None, item_id))
+        
+        with caplog.at_level(logging.ERROR):
+            assert daemon._flush_rows(rows) is False
+        assert "dropping it" in caplog.text
+        assert rows['logs'] == []
+        
+        rows['logs'].append(('steam', 'priceoverview', None, 200, 5, True, None, item_id))
+        assert daemon._flush_rows(rows) is True
+        assert count_rows(daemon, "fetch_logs") == 1
+    
+    def test_cycle_survives_write_errors(self, daemon, market, monkeypatch):
+        """Test a database error while flushing doesn't end the cycle."""
+        daemon.db_client.get_or_create_item("Item A")
+        def fail(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+        monkeypatch.setattr(daemon.db_client, 'flush_batch', fail)
+        
+        daemon.run_once()
+    
+    def test_dropped_batch_is_refetched(self, daemon, monkeypatch):
+        """Test prices from a dropped batch are written next cycle, not hidden by 304s."""
+        daemon.db_client.get_or_create_item("Item A", buff_goods_id=77)
+        
+        def conditional(body):
+            def callback(request):
+                if request.headers.get('If-None-Match') == '"v1"':
+                    return (304, {}, '')
+                return (200, {'ETag': '"v1"'}, json.dumps(body))
+            return callback
+        
+        with responses.RequestsMock() as rsps:
+            rsps.add_callback(responses.GET, STEAM_PRICE_URL, callback=conditional(
+                {'success': True, 'lowest_price': '$10.50', 'volume': '12'}
+            ))
+            rsps.add_callback(responses.GET, BuffFetcher.SELL_ORDER_URL, callback=conditional(
+                {'data': {'items': [{'price': '8.50'}]}}
+            ))
+            
+            flush_batch = daemon.db_client.flush_batch
+            def fail(*args, **kwargs):
+                raise sqlite3.OperationalError("database is locked")
+            monkeypatch.setattr(daemon.db_client, 'flush_batch', fail)
+            daemon.run_once()
+            
+            monkeypatch.setattr(daemon.db_client, 'flush_batch', flush_batch)
+            next_tick()
+            daemon.run_once()
+            next_tick()
+            daemon.run_once()
+            statuses = [call.response.status_code for call in rsps.calls]
+        
+        # Written by the second cycle; the third gets 304s and keeps them
+        assert statuses == [200, 200, 200, 200, 304, 304]
+        assert count_rows(daemon, "steam_snapshots") == 1
+        assert count_rows(daemon, "buff_snapshots") == 1
+
+
+class TestSearchCache:
+    """Test cases for the negative Buff search cache."""
+    
+    def search_calls(self, market):
+        return sum(call.request.url.startswith(BuffFetcher.SEARCH_URL) for call in market.calls)
+    
+    @pytest.mark.parametrize("response", [
+        {'json': {'items': []}},
+        {'status': 404, 'json': {}},
+    ], ids=["no_goods", "not_found"])
+    def test_definitive_failures_are_remembered(self, daemon, market, response):
+        """Test names with no goods (or a rejected search) aren't searched every cycle."""
+        daemon.db_client.get_or_create_item("Item A")
+        market.replace(responses.GET, BuffFetcher.SEARCH_URL, **response)
+        
+        daemon.run_once()
+        next_tick()
+        daemon.run_once()
+        
+        assert "Item A" in daemon._failed_searches
+        assert self.search_calls(market) == 1
+    
+    @pytest.mark.parametrize("response", [
+        {'status': 429, 'json': {}},
+        {'status': 503, 'json': {}},
+        {'body': requests.exceptions.ConnectionError("connection refused")},
+    ], ids=["rate_limited", "server_error", "connection_error"])
+    def test_transient_failures_are_retried(self, daemon, market, response):
+        """Test a Buff outage doesn't hide items for SEARCH_RETRY_SECONDS."""
+        daemon.db_client.get_or_create_item("Item A")
+        market.replace(responses.GET, BuffFetcher.SEARCH_URL, **response)
+        
+        daemon.run_once()
+        first_cycle = self.search_calls(market)
+        next_tick()
+        daemon.run_once()
+        
+        assert "Item A" not in daemon._failed_searches
+        assert first_cycle > 0
+        assert self.search_calls(market) > first_cycle
+
+
+class TestStop:
+    """Test cases for stopping the daemon."""
+    
+    @pytest.mark.parametrize("signum", [signal.SIGTERM, signal.SIGINT], ids=["SIGTERM", "SIGINT"])
+    def test_signal_stops_run(self, daemon, market, monkeypatch, signum):
+        """Test a signal during a cycle ends run() after it, without waiting out the interval."""
+        daemon.db_client.get_or_create_item("Item A")
+        previous_handler = signal.getsignal(signum)
+        # Checked before the fixture closes the database
+        monkeypatch.setattr(daemon, 'close', lambda: None)
+        
+        cycles = []
+        run_cycle = daemon.run_cycle
+        def run_cycle_then_signal():
+            run_cycle()
+            cycles.append(time.monotonic())
+            os.kill(os.getpid(), signum)
+        monkeypatch.setattr(daemon, 'run_cycle', run_cycle_then_signal)
+        
+        start = time.monotonic()
+        daemon.run()
+        
+        assert len(cycles) == 1
+        assert time.monotonic() - start < daemon.interval_seconds
+        assert count_rows(daemon, "fetch_logs") == 2
+        assert signal.getsignal(signum) is previous_handler
+    
+    def test_stop_skips_pending_fetches(self, daemon, market):
+        """Test fetches that haven't started when stop() is called are skipped."""
+        daemon.db_client.get_or_create_item("Item A")
+        daemon.stop()
+        
+        daemon.run_once()
+        
+        assert len(market.calls) == 0
+        assert count_rows(daemon, "fetch_logs") == 0
+    
+    def test_stop_from_another_thread(self, daemon, market, monkeypatch):
+        """Test stop() ends a run() that isn't on the main thread."""
+        monkeypatch.setattr(daemon, 'close', lambda: None)
+        thread = threading.Thread(target=daemon.run)
+        thread.start()
+        
+        daemon.stop()
+        thread.join(timeout=10)
+        
+        assert not thread.is_alive()
+    
+    
+    def test_once_closes_after_failed_cycle(self, tmp_path, monkeypatch):
+        """Test --once releases the sessions and database even if the cycle raises."""
+        db_path = str(tmp_path / "test.sqlite")
+        init_database(db_path)
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text("puller:\n  max_workers: 2\n")
+        monkeypatch.setattr(daemon_module, 'setup_logging', lambda log_config: types.SimpleNamespace(stop=lambda: None))
+        monkeypatch.setattr(sys, 'argv', ['daemon.py', '--once', '--config', str(config_path), '--db_path', db_path])
+        
+        def fail(self):
+            raise RuntimeError("cycle failed")
+        closed = []
+        close = PullerDaemon.close
+        def record_close(self):
+            closed.append(self)
+            close(self)
+        monkeypatch.setattr(PullerDaemon, 'run_cycle', fail)
+        monkeypatch.setattr(PullerDaemon, 'close', record_close)
+        
+        with pytest.raises(RuntimeError):
+            daemon_module.main()
+        assert len(closed) == 1
+
+
+class TestSchedule:
+    """Test cases for the deadline schedule in run()."""
+    
+    def run_cycles(self, daemon, monkeypatch, durations):
+        """Run one cycle per duration on a fake clock.
+        
+        Returns:
+            Tuple of (cycle start times, waits between cycles)
+        """
+        clock = types.SimpleNamespace(now=1000.0)
+        clock.monotonic = lambda: clock.now
+        monkeypatch.setattr(daemon_module, 'time', clock)
+        monkeypatch.setattr(daemon.db_client, 'maybe_run_maintenance', lambda: None)
+        monkeypatch.setattr(daemon, 'close', lambda: None)
+        
+        starts, waits = [], []
+        def run_cycle():
+            starts.append(clock.now)
+            clock.now += durations[len(starts) - 1]
+        def wait(timeout):
+            waits.append(timeout)
+            clock.now += timeout
+            if len(waits) == len(durations):
+                daemon.stop()
+            return daemon._stop.is_set()
+        monkeypatch.setattr(daemon, 'run_cycle', run_cycle)
+        monkeypatch.setattr(daemon._stop, 'wait', wait)
+        
+        daemon.run()
+        return starts, waits
+    
+    def test_cycles_start_on_the_interval(self, daemon, monkeypatch):
+        """Test a cycle's own duration doesn't add to the period."""
+        starts, waits = self.run_cycles(daemon, monkeypatch, [10.0, 25.0, 59.0])
+        
+        assert starts == [1000.0, 1060.0, 1120.0]
+        assert waits == [50.0, 35.0, 1.0]
+    
+    def test_overrun_starts_next_cycle_now(self, daemon, monkeypatch, caplog):
+        """Test an overrun starts the next cycle at once, without catching up."""
+        with caplog.at_level(logging.WARNING):
+            starts, waits = self.run_cycles(daemon, monkeypatch, [10.0, 130.0, 5.0])
+        
+        assert starts == [1000.0, 1060.0, 1190.0]
+        assert waits == [50.0, 0.0, 55.0]
+        assert "overran" in caplog.text
+
+
+class TestAsyncCycle:
+    """Test cases for run_once_async."""
+    
+    def test_cycles_end_to_end(self, daemon, local_market):
+        """Test async cycles write all rows and reuse one session and set of fetchers."""
+        for name in ("Item A", "Item B"):
+            daemon.db_client.get_or_create_item(name)
+        daemon.use_async = True
+        
+        daemon.run_cycle()
+        fetchers, session = daemon._async_fetchers, daemon._session
+        next_tick()
+        daemon.run_cycle()
+        
+        # Same fetchers, so the per-minute token budget carries over
+        assert daemon._async_fetchers is fetchers
+        assert daemon._session is session
+        assert count_rows(daemon, "steam_snapshots") == 4
+        assert count_rows(daemon, "buff_snapshots") == 4
+        assert count_rows(daemon, "fetch_logs") == 8
+        # Goods IDs were stored by the first cycle, so only searched once
+        assert local_market.count('/search') == 2
+        with daemon.db_client.connection() as conn:
+            assert [row[0] for row in conn.execute("SELECT buff_goods_id FROM items")] == [77, 78]
+        
+        daemon._loop.run_until_complete(daemon._close_async())
+        assert session.closed
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
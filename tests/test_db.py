@@ -0,0 +1,202 @@
+"""Tests for database client."""
+
+import sqlite3
+import pytest
+from migrations.init_db import init_database
+from src.db.client import DatabaseClient, utc_timestamp
+
+
+@pytest.fixture
+def db_client(tmp_path):
+    """Database client on a fresh schema."""
+    db_path = str(tmp_path / "test.sqlite")
+    init_database(db_path)
+    client = DatabaseClient(db_path)
+    yield client
+    client.close()
+
+
+class TestDatabaseClient:
+    """Test cases for DatabaseClient."""
+    
+    def test_get_or_create_item(self, db_client):
+        """Test items are created once and goods ID is updated."""
+        item_id = db_client.get_or_create_item("AK-47 | Redline (Field-Tested)")
+        assert db_client.get_or_create_item("AK-47 | Redline (Field-Tested)", 33815) == item_id
+        # Omitting the goods ID keeps the stored one
+        assert db_client.get_or_create_item("AK-47 | Redline (Field-Tested)") == item_id
+        
+        with db_client.connection() as conn:
+            row = conn.execute("SELECT buff_goods_id FROM items WHERE item_id = ?", (item_id,)).fetchone()
+        assert row['buff_goods_id'] == 33815
+    
+    def test_bulk_upsert_items(self, db_client):
+        """Test bulk upserts keep stored goods IDs the same way get_or_create_item does."""
+        db_client.bulk_upsert_items([("Item A", 101), ("Item B", None)])
+        db_client.bulk_upsert_items([("Item A", None), ("Item B", 202), ("Item C", None)])
+        
+        with db_client.connection() as conn:
+            rows = conn.execute("SELECT market_hash_name, buff_goods_id FROM items ORDER BY market_hash_name").fetchall()
+        assert [tuple(row) for row in rows] == [("Item A", 101), ("Item B", 202), ("Item C", None)]
+    
+    def test_item_id_cache(self, db_client):
+        """Test repeated lookups are served from the in-process cache."""
+        item_id = db_client.get_or_create_item("Item A")
+        
+        with db_client.connection() as conn:
+            conn.execute("DELETE FROM items")
+        assert db_client.get_or_create_item("Item A") == item_id
+        
+        db_client.invalidate_item_cache()
+        assert db_client.get_or_create_item("Item A") != item_id
+    
+    def test_writes_visible_to_other_connections(self, db_client):
+        """Test the shared connection autocommits single inserts."""
+        item_id = db_client.get_or_create_item("AWP | Asiimov (Field-Tested)")
+        db_client.insert_steam_snapshot(item_id, best_bid=10.0)
+        
+        conn = db_client.get_connection()
+        count = conn.execute("SELECT COUNT(*) FROM steam_snapshots").fetchone()[0]
+        conn.close()
+        assert count == 1
+    
+    def test_bulk_inserts(self, db_client):
+        """Test bulk snapshot and fetch log inserts across several chunks."""
+        db_client.BULK_CHUNK_SIZE = 2
+        # Snapshots are unique per (item_id, timestamp), so one item per row
+        item_ids = [db_client.get_or_create_item(f"Item {i}") for i in range(5)]
+        
+        steam_rows = [
+            (item_id, None, 10.0 + i, None, None, None, None, None, None, 3, {'i': i})
+            for i, item_id in enumerate(item_ids)
+        ]
+        buff_rows = [
+            (item_id, None, 8.0, None, None, None, 12, None, 'CNY', None)
+            for item_id in item_ids[:3]
+        ]
+        log_rows = [('steam', 'priceoverview', None, 200, 50, True, None, item_ids[0])] * 3
+        
+        assert db_client.insert_steam_snapshots_bulk(steam_rows) == 5
+        assert db_client.insert_buff_snapshots_bulk(buff_rows) == 3
+        assert db_client.log_fetches_bulk(log_rows) == 3
+        
+        with db_client.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM steam_snapshots").fetchone()[0] == 5
+            assert conn.execute("SELECT COUNT(*) FROM buff_snapshots").fetchone()[0] == 3
+            assert conn.execute("SELECT COUNT(*) FROM fetch_logs").fetchone()[0] == 3
+            snapshot_ids = [row[0] for row in conn.execute(
+                "SELECT snapshot_id FROM steam_snapshots ORDER BY snapshot_id"
+            )]
+        assert [db_client.get_raw_response(sid, 'steam') for sid in snapshot_ids] == [
+            {'i': i} for i in range(5)
+        ]
+        assert db_client.get_raw_response(snapshot_ids[0], 'buff') is None
+    
+    def test_raw_response_side_table(self, db_client):
+        """Test raw responses are stored compressed and can be skipped."""
+        item_id = db_client.get_or_create_item("Item A")
+        snapshot_id = db_client.insert_steam_snapshot(item_id, best_bid=10.0, raw_response={'success': True})
+        assert db_client.get_raw_response(snapshot_id, 'steam') == {'success': True}
+        
+        db_client.store_raw = False
+        other_id = db_client.get_or_create_item("Item B")
+        snapshot_id = db_client.insert_buff_snapshot(other_id, best_ask=8.0, raw_response={'data': {}})
+        assert db_client.get_raw_response(snapshot_id, 'buff') is None
+    
+    @pytest.mark.parametrize("window_functions", [True, False])
+    def test_get_latest_snapshots(self, db_client, window_functions):
+        """Test latest snapshot per item and source is returned."""
+        db_client.WINDOW_FUNCTIONS = window_functions
+        first = db_client.get_or_create_item("Item A")
+        second = db_client.get_or_create_item("Item B")
+        
+        with db_client.connection() as conn:
+            conn.executemany(
+                "INSERT INTO steam_snapshots (item_id, timestamp, best_bid) VALUES (?, ?, ?)",
+                [(first, '2024-01-01 00:00:00', 10.0), (first, '2024-01-02 00:00:00', 11.0)]
+            )
+            conn.execute(
+                "INSERT INTO buff_snapshots (item_id, timestamp, best_ask) VALUES (?, ?, ?)",
+                (first, '2024-01-01 12:00:00', 8.0)
+            )
+        
+        latest = db_client.get_latest_snapshots()
+        assert [row['item_id'] for row in latest] == [first, second]
+        assert latest[0]['steam_best_bid'] == 11.0
+        assert latest[0]['buff_best_ask'] == 8.0
+        assert latest[1]['steam_timestamp'] is None
+        
+        single = db_client.get_latest_snapshots(first)
+        assert single == latest[:1]
+    
+    def test_get_price_history_window(self, db_client):
+        """Test price history only returns snapshots inside the window."""
+        item_id = db_client.get_or_create_item("Item A")
+        db_client.insert_steam_snapshot(item_id, best_bid=10.0)
+        with db_client.connection() as conn:
+            conn.execute(
+                "INSERT INTO steam_snapshots (item_id, best_bid, timestamp) "
+                "VALUES (?, 9.0, datetime('now', '-10 days'))", (item_id,)
+            )
+        
+        history = db_client.get_price_history(item_id, days=7)
+        assert [row['best_bid'] for row in history['steam']] == [10.0]
+        assert len(db_client.get_price_history(item_id, days=30)['steam']) == 2
+    
+    def test_maintenance_interval(self, db_client):
+        """Test maintenance only runs once the interval has passed."""
+        assert db_client.maybe_run_maintenance() is False
+        
+        db_client.MAINTENANCE_INTERVAL = 0
+        assert db_client.maybe_run_maintenance() is True
+        with db_client.connection() as conn:
+            assert conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 10000
+    
+    def test_flush_batch_is_atomic(self, db_client):
+        """Test a failing row rolls back the whole batch."""
+        item_id = db_client.get_or_create_item("Item A")
+        steam_rows = [(item_id, None, 10.0, None, None, None, None, None, None, 3, None)]
+        buff_rows = [(item_id, None, 8.0, None, None, None, 2, None, 'CNY', None)]
+        
+        with pytest.raises(sqlite3.IntegrityError):
+            db_client.flush_batch(steam_rows, buff_rows, [(None, None, None, None, None, True, None, item_id)])
+        with db_client.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM steam_snapshots").fetchone()[0] == 0
+        
+        db_client.flush_batch(steam_rows, buff_rows, [('steam', 'priceoverview', None, 200, 5, True, None, item_id)])
+        with db_client.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM buff_snapshots").fetchone()[0] == 1
+            assert conn.execute("SELECT COUNT(*) FROM fetch_logs").fetchone()[0] == 1
+    
+    def test_flush_batch_keeps_fetch_times(self, db_client):
+        """Test batched rows keep the time they were fetched, not the flush time."""
+        item_id = db_client.get_or_create_item("Item A")
+        fetched = ['2024-01-01 00:00:00.125', '2024-01-01 00:05:00.500']
+        steam_rows = [(item_id, ts, 10.0, None, None, None, None, None, None, 3, None) for ts in fetched]
+        log_rows = [('steam', 'priceoverview', ts, 200, 5, True, None, item_id) for ts in fetched]
+        
+        # Two fetches of one item in a batch don't collide on UNIQUE(item_id, timestamp)
+        db_client.flush_batch(steam_rows, [], log_rows)
+        
+        with db_client.connection() as conn:
+            assert [row[0] for row in conn.execute(
+                "SELECT timestamp FROM steam_snapshots ORDER BY timestamp"
+            )] == fetched
+            assert [row[0] for row in conn.execute(
+                "SELECT timestamp FROM fetch_logs ORDER BY timestamp"
+            )] == fetched
+        assert utc_timestamp() > fetched[-1]
+    
+    def test_transaction_rollback(self, db_client):
+        """Test a failing transaction block leaves no rows behind."""
+        with pytest.raises(sqlite3.IntegrityError):
+            with db_client.transaction() as conn:
+                conn.execute("INSERT INTO items (market_hash_name) VALUES ('a')")
+                conn.execute("INSERT INTO items (market_hash_name) VALUES ('a')")
+        
+        with db_client.connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -1,9 +1,30 @@
 """Tests for data fetchers."""
 
+import asyncio
+import os
 import pytest
-from unittest.mock import Mock, patch
-from src.fetcher.steam import SteamFetcher
+import responses
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.fetcher.aio import AdaptiveLimiter, AsyncBuffFetcher
+from src.fetcher.steam import SteamFetcher, parse_prices_bulk
 from src.fetcher.buff import BuffFetcher
+from src.fetcher._config import load_config
+from src.fetcher._http import _PacedRetry
+from src.fetcher._ratelimit import TokenBucket
+
+# Registered without the query string, which responses ignores when matching
+STEAM_PRICE_URL = "https://steamcommunity.com/market/priceoverview/"
+
+
+def serve(handler, client):
+    """Run client(base_url) against a local aiohttp server using handler."""
+    async def main():
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', handler)
+        async with TestServer(app) as server:
+            return await client(str(server.make_url('')).rstrip('/'))
+    return asyncio.run(main())
 
 
 class TestSteamFetcher:
@@ -28,18 +49,23 @@ class TestSteamFetcher:
         # Test invalid
         assert fetcher._parse_price("invalid") is None
     
-    @patch('src.fetcher.steam.requests.get')
-    def test_fetch_price_overview_success(self, mock_get):
+    def test_parse_prices_bulk(self):
+        """Test bulk parsing matches _parse_price, including a stray newline."""
+        fetcher = SteamFetcher()
+        prices = ["$12.34", "€10.50", None, "$1,234.56", "invalid", "", "$5\n"]
+        
+        assert parse_prices_bulk(prices) == [fetcher._parse_price(p) for p in prices]
+        assert parse_prices_bulk(prices[:4]) == [12.34, 10.50, None, 1234.56]
+    
+    @responses.activate
+    def test_fetch_price_overview_success(self):
         """Test successful price fetch."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        responses.add(responses.GET, STEAM_PRICE_URL, json={
             'success': True,
             'lowest_price': '$10.50',
             'volume': '1,234',
             'median_price': '$11.00'
-        }
-        mock_get.return_value = mock_response
+        })
         
         fetcher = SteamFetcher()
         result = fetcher.fetch_price_overview("AK-47 | Redline (Field-Tested)")
@@ -48,25 +74,125 @@ class TestSteamFetcher:
         assert result['success'] is True
         assert result['lowest_price'] == 10.50
         assert result['median_price'] == 11.00
+    
+    @responses.activate
+    def test_fetch_price_overview_cached(self):
+        """Test repeated fetches within the TTL are served from cache."""
+        responses.add(responses.GET, STEAM_PRICE_URL, json={
+            'success': True,
+            'lowest_price': '$10.50',
+            'volume': '1,234',
+            'median_price': '$11.00'
+        })
+        
+        fetcher = SteamFetcher()
+        first = fetcher.fetch_price_overview("AK-47 | Redline (Field-Tested)")
+        second = fetcher.fetch_price_overview(market_hash_name="AK-47 | Redline (Field-Tested)")
+        
+        assert 'cached' not in first
+        assert second == {**first, 'cached': True}
+        assert len(responses.calls) == 1
+    
+    @responses.activate
+    def test_fetch_price_overview_disk_cache(self, tmp_path):
+        """Test Steam prices persisted on disk are reused by a new fetcher."""
+        responses.add(responses.GET, STEAM_PRICE_URL, json={'success': True, 'lowest_price': '$10.50'})
+        
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(f"cache:\n  steam_disk_path: {tmp_path / 'steam.sqlite'}\n")
+        
+        with SteamFetcher(str(config_path)) as fetcher:
+            first = fetcher.fetch_price_overview("AK-47 | Redline (Field-Tested)")
+        with SteamFetcher(str(config_path)) as fetcher:
+            second = fetcher.fetch_price_overview("AK-47 | Redline (Field-Tested)")
+        
+        # Marked, since the price may be from an earlier run
+        assert second == {**first, 'cached': True}
+        assert len(responses.calls) == 1
+    
+    @responses.activate
+    def test_fetch_price_overview_not_modified(self):
+        """Test the last ETag is sent back and a 304 reports unchanged."""
+        responses.add(
+            responses.GET, STEAM_PRICE_URL,
+            json={'success': True, 'lowest_price': '$10.50'}, headers={'ETag': '"abc"'}
+        )
+        responses.add(responses.GET, STEAM_PRICE_URL, status=304)
+        
+        fetcher = SteamFetcher()
+        assert fetcher.fetch_price_overview("AK-47 | Redline (Field-Tested)")['lowest_price'] == 10.50
+        fetcher.response_cache.clear()
+        result = fetcher.fetch_price_overview("AK-47 | Redline (Field-Tested)")
+        
+        assert responses.calls[1].request.headers['If-None-Match'] == '"abc"'
+        assert result['success'] is True
+        assert result['unchanged'] is True
+    
+    def test_reset_cycle_cache(self):
+        """Test a new cycle empties the cache and never shortens the configured TTL."""
+        fetcher = SteamFetcher()
+        configured_ttl = fetcher.response_cache.ttl
+        fetcher.response_cache.set('key', {'success': True})
+        
+        fetcher.reset_cycle_cache(configured_ttl * 10)
+        assert 'key' not in fetcher.response_cache
+        assert fetcher.response_cache.ttl == configured_ttl * 10
+        
+        fetcher.reset_cycle_cache(1)
+        assert fetcher.response_cache.ttl == configured_ttl
+    
+    def test_session_retries_transient_errors(self):
+        """Test the pooled session retries 429/5xx inside urllib3."""
+        fetcher = SteamFetcher()
+        retry = fetcher._session.get_adapter('https://steamcommunity.com').max_retries
+        
+        assert retry.total == fetcher.max_retries - 1
+        assert 429 in retry.status_forcelist
+        assert 503 in retry.status_forcelist
+        assert retry.bucket is fetcher.bucket
+    
+    @responses.activate
+    def test_retries_take_tokens(self):
+        """Test automatic retries take rate limit tokens and back off by backoff_base."""
+        responses.add(responses.GET, STEAM_PRICE_URL, status=503)
+        responses.add(responses.GET, STEAM_PRICE_URL, json={'success': True, 'lowest_price': '$10.50'})
+        
+        fetcher = SteamFetcher()
+        tokens = []
+        fetcher.bucket.acquire = lambda amount=1.0: tokens.append(amount)
+        result = fetcher.fetch_price_overview("AK-47 | Redline (Field-Tested)")
+        
+        assert result['lowest_price'] == 10.50
+        assert len(tokens) == len(responses.calls) == 2
+        
+        retry = _PacedRetry(total=5, backoff_base=3.0)
+        delays = []
+        for _ in range(3):
+            retry = retry.increment('GET', '/', error=ConnectionError())
+            delays.append(retry.get_backoff_time())
+        assert delays == [1.0, 3.0, 9.0]
+        
+        # urllib3 1.26 has no backoff_max attribute
+        del retry.backoff_max
+        assert retry.get_backoff_time() == 9.0
+        retry.backoff_base = 1000.0
+        assert retry.get_backoff_time() == _PacedRetry.DEFAULT_BACKOFF_MAX
 
 
 class TestBuffFetcher:
     """Test cases for BuffFetcher."""
     
-    @patch('src.fetcher.buff.requests.get')
-    def test_get_sell_orders_success(self, mock_get):
+    @responses.activate
+    def test_get_sell_orders_success(self):
         """Test successful sell orders fetch."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        responses.add(responses.GET, BuffFetcher.SELL_ORDER_URL, json={
             'data': {
                 'items': [
                     {'price': '8.50'},
                     {'price': '8.60'}
                 ]
             }
-        }
-        mock_get.return_value = mock_response
+        })
         
         fetcher = BuffFetcher()
         result = fetcher.get_sell_orders(12345)
@@ -76,20 +202,17 @@ class TestBuffFetcher:
         assert result['best_ask'] == 8.50
         assert result['order_count'] == 2
     
-    @patch('src.fetcher.buff.requests.get')
-    def test_get_buy_orders_success(self, mock_get):
+    @responses.activate
+    def test_get_buy_orders_success(self):
         """Test successful buy orders fetch."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        responses.add(responses.GET, BuffFetcher.BUY_ORDER_URL, json={
             'data': {
                 'items': [
                     {'price': '7.50'},
                     {'price': '7.40'}
                 ]
             }
-        }
-        mock_get.return_value = mock_response
+        })
         
         fetcher = BuffFetcher()
         result = fetcher.get_buy_orders(12345)
@@ -98,6 +221,148 @@ class TestBuffFetcher:
         assert result['success'] is True
         assert result['best_bid'] == 7.50
         assert result['order_count'] == 2
+    
+    @responses.activate
+    def test_get_orders_both(self):
+        """Test sell and buy orders are fetched together."""
+        responses.add(responses.GET, BuffFetcher.SELL_ORDER_URL, json={'data': {'items': [{'price': '8.50'}]}})
+        responses.add(responses.GET, BuffFetcher.BUY_ORDER_URL, json={'data': {'items': [{'price': '7.50'}]}})
+        
+        fetcher = BuffFetcher()
+        sell_result, buy_result = fetcher.get_orders_both(12345)
+        
+        assert sell_result['best_ask'] == 8.50
+        assert buy_result['best_bid'] == 7.50
+        assert len(responses.calls) == 2
+    
+    @responses.activate
+    def test_reset_cycle_cache(self):
+        """Test orders cached in one cycle are fetched again in the next."""
+        responses.add(responses.GET, BuffFetcher.SELL_ORDER_URL, json={'data': {'items': [{'price': '8.50'}]}})
+        
+        fetcher = BuffFetcher()
+        fetcher.reset_cycle_cache(10)
+        fetcher.get_sell_orders(12345)
+        fetcher.get_sell_orders(12345)
+        assert len(responses.calls) == 1
+        
+        fetcher.reset_cycle_cache(10)
+        fetcher.get_sell_orders(12345)
+        assert len(responses.calls) == 2
+        assert fetcher.response_cache.ttl == fetcher.config.get('cache', {}).get('ttl_seconds', 60)
+
+
+class TestAsyncFetchers:
+    """Test cases for the aiohttp fetchers."""
+    
+    def test_retries_acquire_tokens(self):
+        """Test every attempt, retries included, takes a rate limit token."""
+        requests_seen = []
+        
+        async def handler(request):
+            requests_seen.append(request.path)
+            if len(requests_seen) == 1:
+                return web.Response(status=500)
+            return web.json_response({'data': {'items': [{'price': '8.50'}]}})
+        
+        async def client(base_url):
+            async with AsyncBuffFetcher() as fetcher:
+                fetcher.SELL_ORDER_URL = f"{base_url}/sell_order"
+                tokens = []
+                acquire = fetcher.bucket.acquire
+                
+                async def counting_acquire(amount=1.0):
+                    tokens.append(amount)
+                    await acquire(amount)
+                fetcher.bucket.acquire = counting_acquire
+                
+                return await fetcher.get_sell_orders(12345), len(tokens)
+        
+        result, tokens = serve(handler, client)
+        
+        assert result['best_ask'] == 8.50
+        assert tokens == len(requests_seen) == 2
+    
+    def test_client_errors_not_retried(self):
+        """Test a 404 is returned at once, like the sync session does."""
+        requests_seen = []
+        
+        async def handler(request):
+            requests_seen.append(request.path)
+            return web.Response(status=404)
+        
+        async def client(base_url):
+            async with AsyncBuffFetcher() as fetcher:
+                fetcher.SEARCH_URL = f"{base_url}/search"
+                return await fetcher.search_goods("Item A")
+        
+        result = serve(handler, client)
+        
+        assert result['success'] is False
+        assert result['status_code'] == 404
+        assert len(requests_seen) == 1
+    
+    
+    def test_limiter_cancelled_while_paused(self):
+        """Test a request cancelled during a rate limit pause doesn't keep its slot."""
+        async def run():
+            limiter = AdaptiveLimiter(max_concurrency=1)
+            limiter._pause(60)
+            
+            async def request():
+                async with limiter:
+                    pass
+            task = asyncio.create_task(request())
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            
+            limiter._paused_until = 0.0
+            await asyncio.wait_for(request(), timeout=1)
+            return limiter._in_flight
+        
+        assert asyncio.run(run()) == 0
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket."""
+    
+    def test_burst_then_wait(self):
+        """Test bursts up to capacity are free, then callers wait for refill."""
+        bucket = TokenBucket(rate=10.0, capacity=3)
+        
+        assert [bucket._reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket._reserve() == pytest.approx(0.1, abs=0.01)
+        assert bucket._reserve() == pytest.approx(0.2, abs=0.01)
+
+
+class TestLoadConfig:
+    """Test cases for load_config."""
+    
+    def test_cached_until_modified(self, tmp_path):
+        """Test config is parsed once and reparsed after the file changes."""
+        path = tmp_path / "config.yaml"
+        path.write_text("steam:\n  rate_limit: 20\n")
+        
+        first = load_config(str(path))
+        assert first == {'steam': {'rate_limit': 20}}
+        assert load_config(str(path)) is first
+        
+        path.write_text("steam:\n  rate_limit: 30\n")
+        os.utime(path, (0, path.stat().st_mtime + 1))
+        assert load_config(str(path)) == {'steam': {'rate_limit': 30}}
+    
+    def test_toml(self, tmp_path):
+        """Test .toml configs parse to the same shape as YAML."""
+        path = tmp_path / "config.toml"
+        path.write_text("[steam]\nrate_limit = 20\n")
+        
+        assert load_config(str(path)) == {'steam': {'rate_limit': 20}}
+    
+    def test_missing_file(self, tmp_path):
+        """Test a missing config file gives an empty config."""
+        assert load_config(str(tmp_path / "missing.yaml")) == {}
 
 
 if __name__ == "__main__":
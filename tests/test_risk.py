@@ -0,0 +1,175 @@
+"""Tests for risk analysis."""
+
+import numpy as np
+import pytest
+from src.analysis.kernels import SEED_CHUNK, simulate_pnl
+from src.analysis.risk import RiskAnalyzer, SKIP, MONITOR, CANDIDATE
+
+
+class TestRiskAnalyzer:
+    """Test cases for RiskAnalyzer."""
+    
+    def test_incremental_volatility(self):
+        """Test incremental volatility matches a full recompute."""
+        analyzer = RiskAnalyzer()
+        prices = [10.0, 10.4, 9.9, 10.1, 10.8, 10.5]
+        
+        for price in prices:
+            vol = analyzer.update_and_get_volatility(1, price)
+        
+        expected = np.std(np.diff(np.log(prices)), ddof=1)
+        assert vol == pytest.approx(expected)
+        assert analyzer.calculate_volatility(prices) == pytest.approx(expected)
+    
+    def test_closed_form_matches_monte_carlo(self):
+        """Test closed-form metrics agree with a large Monte Carlo run."""
+        analyzer = RiskAnalyzer()
+        
+        closed = analyzer.analyze_hold_period_risk(10.0, 8.3, 0.05, 3)
+        mc = analyzer.analyze_hold_period_risk(
+            10.0, 8.3, 0.05, 3, n_simulations=200000, method='monte_carlo'
+        )
+        
+        assert closed['prob_positive'] == pytest.approx(mc['prob_positive'], abs=0.01)
+        assert closed['expected_pnl'] == pytest.approx(mc['expected_pnl'], abs=0.02)
+        assert closed['var_95'] == pytest.approx(mc['var_95'], abs=0.02)
+        assert closed['var_99'] == pytest.approx(mc['var_99'], abs=0.03)
+    
+    def test_closed_form_zero_volatility(self):
+        """Test zero volatility collapses to the current PnL."""
+        analyzer = RiskAnalyzer()
+        result = analyzer.analyze_hold_period_risk(10.0, 8.3, 0.0, 3)
+        
+        assert result['prob_positive'] == 1.0
+        assert result['expected_pnl'] == pytest.approx(result['current_pnl'])
+        assert result['var_99'] == pytest.approx(result['current_pnl'])
+    
+    def test_float32_prices_match_float64(self):
+        """Test float32 Monte Carlo prices stay within 1e-3 of float64."""
+        Z = np.random.default_rng(0).standard_normal(100000)
+        
+        prices64 = RiskAnalyzer._normals_to_prices(Z.copy(), 10.0, 0.05, 3, 0.0)
+        prices32 = RiskAnalyzer._normals_to_prices(Z.astype(np.float32), 10.0, 0.05, 3, 0.0)
+        
+        assert prices32.dtype == np.float32
+        assert np.max(np.abs(prices32 / prices64 - 1)) < 1e-3
+        
+        pct64 = np.percentile(prices64, [1, 5])
+        pct32 = np.percentile(prices32, [1, 5])
+        assert np.all(np.abs(pct32 / pct64 - 1) < 1e-3)
+    
+    @pytest.mark.parametrize("dtype", [np.float64, np.float32])
+    def test_sobol_normals(self, dtype):
+        """Test Sobol sampling fills Z with balanced normals, reproducibly per seed."""
+        pytest.importorskip("scipy.stats")
+        # Not a power of two, so the draw is trimmed from the next one up
+        Z = RiskAnalyzer(seed=42)._draw_normals(np.empty(1000, dtype=dtype), 'sobol')
+        again = RiskAnalyzer(seed=42)._draw_normals(np.empty(1000, dtype=dtype), 'sobol')
+        
+        assert Z.dtype == dtype
+        assert np.all(np.isfinite(Z))
+        assert np.array_equal(Z, again)
+        # Low discrepancy: far closer to N(0, 1) than 1000 pseudo-random draws
+        assert abs(np.mean(Z, dtype=np.float64)) < 0.01
+        assert np.std(Z, dtype=np.float64) == pytest.approx(1.0, abs=0.01)
+        assert np.percentile(Z, 5) == pytest.approx(-1.645, abs=0.02)
+    
+    def test_numba_matches_closed_form(self):
+        """Test compiled Monte Carlo path (or its fallback) agrees with closed form."""
+        analyzer = RiskAnalyzer()
+        
+        closed = analyzer.analyze_hold_period_risk(10.0, 8.3, 0.05, 3)
+        compiled = analyzer.analyze_hold_period_risk(
+            10.0, 8.3, 0.05, 3, n_simulations=200000, method='numba'
+        )
+        
+        assert compiled['prob_positive'] == pytest.approx(closed['prob_positive'], abs=0.01)
+        assert compiled['expected_pnl'] == pytest.approx(closed['expected_pnl'], abs=0.02)
+    
+    def test_numba_kernel_reproducible(self):
+        """Test the parallel kernel's samples depend only on the seed."""
+        n = 2 * SEED_CHUNK + 100
+        first, second, prefix = np.empty(n), np.empty(n), np.empty(SEED_CHUNK)
+        
+        first_totals = simulate_pnl(10.0, 0.05, 3, 0.13, 8.3, 0.0, 42, first)
+        second_totals = simulate_pnl(10.0, 0.05, 3, 0.13, 8.3, 0.0, 42, second)
+        simulate_pnl(10.0, 0.05, 3, 0.13, 8.3, 0.0, 42, prefix)
+        
+        assert np.array_equal(first, second)
+        assert first_totals == second_totals
+        # Each block is seeded on its own, whatever thread runs it
+        assert np.array_equal(first[:SEED_CHUNK], prefix)
+        assert not np.array_equal(first[:SEED_CHUNK], first[SEED_CHUNK:2 * SEED_CHUNK])
+    
+    def test_cython_matches_closed_form(self):
+        """Test C extension path (or its fallback) agrees with closed form."""
+        analyzer = RiskAnalyzer()
+        
+        closed = analyzer.analyze_hold_period_risk(10.0, 8.3, 0.05, 3)
+        compiled = analyzer.analyze_hold_period_risk(
+            10.0, 8.3, 0.05, 3, n_simulations=200000, method='cython'
+        )
+        
+        assert compiled['prob_positive'] == pytest.approx(closed['prob_positive'], abs=0.01)
+        assert compiled['expected_pnl'] == pytest.approx(closed['expected_pnl'], abs=0.02)
+        assert compiled['var_95'] == pytest.approx(closed['var_95'], abs=0.03)
+    
+    def test_streaming_percentiles(self):
+        """Test P² streaming percentiles agree with closed form."""
+        analyzer = RiskAnalyzer()
+        
+        closed = analyzer.analyze_hold_period_risk(10.0, 8.3, 0.05, 3)
+        streaming = analyzer.analyze_hold_period_risk(
+            10.0, 8.3, 0.05, 3, n_simulations=200000, method='streaming'
+        )
+        
+        assert streaming['var_95'] == pytest.approx(closed['var_95'], abs=0.03)
+        assert streaming['var_99'] == pytest.approx(closed['var_99'], abs=0.05)
+    
+    def test_batch_matches_closed_form(self):
+        """Test batch Monte Carlo agrees with per-item closed form."""
+        analyzer = RiskAnalyzer()
+        steam_bids = np.array([10.0, 25.0, 4.0])
+        buff_asks = np.array([8.3, 20.0, 3.6])
+        vols = np.array([0.05, 0.03, 0.08])
+        
+        batch = analyzer.analyze_hold_period_risk_batch(
+            steam_bids, buff_asks, vols, 3, n_simulations=200000
+        )
+        
+        for i in range(len(steam_bids)):
+            closed = analyzer.analyze_hold_period_risk(
+                steam_bids[i], buff_asks[i], vols[i], 3
+            )
+            assert batch['prob_positive'][i] == pytest.approx(closed['prob_positive'], abs=0.01)
+            assert batch['var_95'][i] == pytest.approx(closed['var_95'], abs=0.05)
+    
+    def test_analyze_many_reproducible(self):
+        """Test analyze_many gives the same results for the same seed."""
+        items = [(10.0, 8.3, 0.05), (25.0, 20.0, 0.03), (4.0, 3.6, 0.08)]
+        
+        first = RiskAnalyzer(seed=42).analyze_many(items, 3, max_workers=3)
+        second = RiskAnalyzer(seed=42).analyze_many(items, 3, max_workers=1)
+        
+        assert first == second
+        for (steam_bid, buff_ask, vol), result in zip(items, first):
+            closed = RiskAnalyzer().analyze_hold_period_risk(steam_bid, buff_ask, vol, 3)
+            assert result['prob_positive'] == pytest.approx(closed['prob_positive'], abs=0.03)
+    
+    def test_recommend_action_batch_matches_scalar(self):
+        """Test batch action codes agree with the scalar recommend_action."""
+        analyzer = RiskAnalyzer()
+        pnl_now = np.array([0.2, 1.0, 1.0, 1.0])
+        prob_positive = np.array([0.9, 0.4, 0.9, 0.9])
+        expected_pnl = np.array([1.0, 1.0, 0.1, 1.0])
+        
+        actions = analyzer.recommend_action_batch(pnl_now, prob_positive, expected_pnl)
+        
+        assert list(actions) == [SKIP, MONITOR, MONITOR, CANDIDATE]
+        for i, code in enumerate(actions):
+            name = analyzer.recommend_action(pnl_now[i], prob_positive[i], expected_pnl[i])
+            assert name == ['skip', 'monitor', 'candidate'][code]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])